@@ -1,222 +1,533 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory, Response
 import os
 import time
 import logging
-from logging.handlers import RotatingFileHandler
+import threading
 
-# Import project modules
-import config
-import emotion_detection
-from utils.weather import WeatherService
-from utils.news import NewsService
+from utils.startup import ImportTimer, BackgroundLoader
 
-# Initialize services
-weather_service = WeatherService(config.OPENCAGE_API_KEY, config.WEATHER_API_TIMEOUT)
-news_service = NewsService(config.HAPPY_NEWS_FILE)
+# Time the imports so startup regressions show up in the log. emotion_detection
+# (DeepFace, TensorFlow, OpenCV) is not imported here but by emotion_loader.
+with ImportTimer() as startup_imports:
+    from flask import Flask, Blueprint, render_template, request, jsonify, Response, g
+    
+    # Import project modules
+    import config
+    from utils.weather import WeatherService, AsyncWeatherService
+    from utils.news import NewsService
+    from utils.event_hub import EventHub
+    from utils.settings_store import SettingsStore
+    from utils.emotion_scheduler import SCREEN_OFF_EMOTION
+    from utils.metrics import MetricsRegistry, CONTENT_TYPE, Metric, gauge, counter
+    from utils.log_pipeline import configure_from_config, logging_stats
 
-# Initialize Flask application
-app = Flask(__name__)
+# Services, created by init_services() so importing this module has no side effects
+weather_service = None
+weather_prefetcher = None
+news_service = None
+settings_store = None
+event_hub = None
+emotion_loader = None
+metrics = None
+route_latency = None
+route_requests = None
 
-# Setup logging
-def setup_logging():
-    if not os.path.exists(config.LOGS_DIR):
-        os.makedirs(config.LOGS_DIR)
+logger = logging.getLogger(__name__)
+bp = Blueprint("mirror", __name__)
+
+# Settings fields whose changes are pushed to clients, by event type
+SETTINGS_EVENTS = {
+    "location": ("city", "country"),
+    "news_source": ("newsSource",)
+}
+_published_settings = {}
+_published_settings_lock = threading.Lock()
+
+# Create the shared services once
+def init_services():
+    global weather_service, weather_prefetcher, news_service, settings_store, event_hub, emotion_loader
+    global metrics, route_latency, route_requests
     
-    file_handler = RotatingFileHandler(
-        os.path.join(config.LOGS_DIR, 'smart_mirror.log'),
-        maxBytes=config.LOG_FILE_MAX_BYTES,
-        backupCount=config.LOG_FILE_BACKUP_COUNT
+    if weather_service is not None:
+        return
+        
+    weather_service = WeatherService(
+        config.OPENCAGE_API_KEY,
+        config.WEATHER_API_TIMEOUT,
+        config.WEATHER_REFRESH_INTERVAL,
+        config.GEOCODE_CACHE_FILE,
+        geocode_url=config.OPENCAGE_API_URL,
+        weather_url=config.OPENWEATHER_API_URL
     )
-    file_handler.setFormatter(logging.Formatter(config.LOG_FORMAT))
-    file_handler.setLevel(getattr(logging, config.LOG_LEVEL))
+    weather_prefetcher = AsyncWeatherService(weather_service, config.WEATHER_MAX_CONCURRENCY)
+    news_service = NewsService(config.HAPPY_NEWS_FILE,
+                               use_mmap=config.NEWS_USE_MMAP,
+                               sampler_file=config.NEWS_SAMPLER_FILE,
+                               recency_half_life=config.NEWS_RECENCY_HALF_LIFE)
+    settings_store = SettingsStore(config.USER_SETTINGS_FILE)
+    event_hub = EventHub(config.SSE_HISTORY_SIZE, config.SSE_QUEUE_SIZE, config.SSE_HEARTBEAT_INTERVAL)
+    emotion_loader = BackgroundLoader("emotion_detection", warm_up=start_emotion_detection)
     
-    app.logger.addHandler(file_handler)
-    app.logger.setLevel(getattr(logging, config.LOG_LEVEL))
-    app.logger.info(f'Smart Mirror v{config.VERSION} startup')
+    metrics = MetricsRegistry()
+    route_latency = metrics.histogram("mirror_http_request_duration_seconds",
+                                      "Time until the response starts, by route", ("route", "method"))
+    route_requests = metrics.counter("mirror_http_requests_total", "Requests by route and status",
+                                     ("route", "method", "status"))
+    metrics.register_collector(collect_service_metrics)
+
+# Setup logging: every logger, Flask's and emotion_detection's included, writes through one background queue
+def setup_logging():
+    configure_from_config('smart_mirror.log')
+    logger.info(f'Smart Mirror v{config.VERSION} startup')
 
 # Ensure all required files exist
 def ensure_files_exist():
-    # Create data directory if it doesn't exist
-    os.makedirs(config.DATA_DIR, exist_ok=True)
+    # Create data and logs directories if they don't exist
+    config.ensure_directories()
     
     # Touch files to ensure they exist
     if not os.path.exists(config.USER_SETTINGS_FILE):
         with open(config.USER_SETTINGS_FILE, "w") as f:
             f.write("{}")
     
-    if not os.path.exists(config.EMOTION_FILE):
-        with open(config.EMOTION_FILE, "w") as f:
-            f.write("neutral")
-    
     if not os.path.exists(config.SCREEN_OPERATION_FILE):
         with open(config.SCREEN_OPERATION_FILE, "w") as f:
             f.write("on")
 
-# Helper function to load user settings
-def load_user_settings():
-    try:
-        import json
-        with open(config.USER_SETTINGS_FILE, "r") as data_file:
-            return json.load(data_file)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
-        app.logger.error(f"Error loading user settings: {e}")
-        return {}
-
-# Helper function to save user settings
-def save_user_settings(data_dict):
-    try:
-        import json
-        with open(config.USER_SETTINGS_FILE, "w") as data_file:
-            json.dump(data_dict, data_file)
-        return True
-    except Exception as e:
-        app.logger.error(f"Error saving user settings: {e}")
-        return False
+# Push changed settings fields to event stream clients
+def publish_settings(user_settings):
+    with _published_settings_lock:
+        changed = False
+        
+        for event_type, keys in SETTINGS_EVENTS.items():
+            values = {key: user_settings.get(key, "") for key in keys}
+            if values != {key: _published_settings.get(key, "") for key in keys}:
+                event_hub.publish(event_type, values)
+                changed = True
+                
+        _published_settings.clear()
+        _published_settings.update(user_settings)
+        
+    if changed:
+        logger.info("Data change detected, notifying clients")
+        # Unnamed event for clients that only reload on "update"
+        event_hub.publish(None, "update")
+
+# Pick up settings edited outside of /setup, with one watcher for all clients
+def watch_settings_file():
+    while True:
+        try:
+            settings_store.refresh(force=True)
+        except Exception as e:
+            logger.error(f"Error watching user settings: {str(e)}")
+            
+        time.sleep(config.SETTINGS_POLL_INTERVAL)
+
+# Push emotion and screen state changes to event stream clients
+def publish_state_change(changed, state):
+    if "emotion" in changed:
+        event_hub.publish("emotion", {"emotion": state.emotion, "confidence": state.confidence})
+    if "screen_on" in changed:
+        event_hub.publish("screen", {"screen_on": state.screen_on})
+
+# Wire the event hub to its sources
+def start_event_hub():
+    with _published_settings_lock:
+        _published_settings.update(settings_store.get())
+        
+    settings_store.subscribe(publish_settings)
+    threading.Thread(target=watch_settings_file, name="settings-watcher", daemon=True).start()
+
+# Runs on the emotion loader thread once emotion_detection is imported
+def start_emotion_detection(emotion_detection):
+    state_store = emotion_detection.get_state_store()
+    if state_store.supports_subscribe:
+        state_store.subscribe(publish_state_change)
+    else:
+        logger.info("Emotion runs in a separate process, emotion and screen events are not streamed")
+        
+    if config.EMOTION_DETECTOR_EXTERNAL:
+        return None
+        
+    ready = emotion_detection.warm_up()
+    emotion_detection.get_scheduler()
+    return ready
+
+# The emotion_detection module, or None while it is still being imported
+def get_emotion_detection():
+    return emotion_loader.module if emotion_loader is not None else None
+
+# Body of a successful /emotion response
+def emotion_response(state):
+    # Detection is skipped while the screen is off, so the stored emotion would only get staler
+    if not state.screen_on:
+        return {
+            "emotion": SCREEN_OFF_EMOTION,
+            "probabilities": {},
+            "confidence": None,
+            "sources": None,
+            "timestamp": state.screen_updated_at,
+            "age": round(time.time() - state.screen_updated_at, 3) if state.screen_updated_at else None
+        }
+        
+    return {
+        "emotion": state.emotion,
+        "probabilities": state.probabilities,
+        "confidence": state.confidence,
+        "sources": state.sources or None,
+        "timestamp": state.emotion_updated_at,
+        "age": round(time.time() - state.emotion_updated_at, 3)
+    }
+
+# Location and API key /weather should be answered for
+def weather_location():
+    user_settings = settings_store.get()
+    return (
+        user_settings.get("city", config.DEFAULT_CITY),
+        user_settings.get("country", config.DEFAULT_COUNTRY),
+        user_settings.get("openWeatherApiKey")
+    )
+
+# Start prefetching weather for the configured locations
+def start_weather_prefetch():
+    user_settings = settings_store.get()
+    api_key = user_settings.get("openWeatherApiKey")
+    
+    if not api_key:
+        logger.info("No OpenWeather API key configured yet, weather prefetch starts on first request")
+        return
+        
+    for city, country in config.WEATHER_LOCATIONS:
+        weather_prefetcher.register_location(city.strip(), country.strip(), api_key, config.WEATHER_UNITS, pinned=True)
+
+    city = user_settings.get("city", config.DEFAULT_CITY).strip()
+    country = user_settings.get("country", config.DEFAULT_COUNTRY).strip()
+    weather_prefetcher.register_location(city, country, api_key, config.WEATHER_UNITS)
+        
+    weather_prefetcher.start()
 
 # Routes
-@app.route('/')
+@bp.route('/')
 def index():
     """Render the main application page."""
-    app.logger.info('Main page accessed')
+    logger.info('Main page accessed')
     return render_template('index.html')
 
-@app.route("/setup", methods=["POST"])
+@bp.route("/setup", methods=["POST"])
 def setup():
     """Handle setup data and store it in the user settings file."""
     data = request.get_json()
     
     if not data:
-        app.logger.warning("Setup called with missing data")
+        logger.warning("Setup called with missing data")
         return jsonify({"status": "error", "message": "Data is missing"}), 400
     
-    existing_data = load_user_settings()
-    
-    # Update only non-empty values
-    for key, value in data.items():
-        if value:
-            existing_data[key] = value
-    
-    if save_user_settings(existing_data):
-        app.logger.info(f"Settings updated: {', '.join(data.keys())}")
-        return jsonify({'status': 'success'})
-    else:
+    try:
+        # Only non-empty values are merged; subscribers publish the change to event streams
+        settings_store.update(data)
+    except ValueError as e:
+        logger.warning(f"Setup called with invalid data: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error saving user settings: {e}")
         return jsonify({"status": "error", "message": "Failed to save data"}), 500
+        
+    logger.info(f"Settings updated: {', '.join(data.keys())}")
+    return jsonify({'status': 'success'})
 
-@app.route('/data', methods=['GET'])
+@bp.route('/data', methods=['GET'])
 def get_data():
-    """Serve the user settings file."""
-    app.logger.info('User settings requested')
-    return send_from_directory(config.DATA_DIR, os.path.basename(config.USER_SETTINGS_FILE))
+    """Serve the user settings."""
+    logger.info('User settings requested')
+    body, etag = settings_store.serialized()
+    
+    if etag in request.if_none_match:
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+        
+    response = Response(body, content_type='application/json')
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
-@app.route('/weather', methods=['GET'])
+@bp.route('/weather', methods=['GET'])
 def get_weather():
     """Fetch and return weather data based on location settings."""
-    user_settings = load_user_settings()
-    
-    city = user_settings.get("city", config.DEFAULT_CITY)
-    country = user_settings.get("country", config.DEFAULT_COUNTRY)
-    open_weather_api_key = user_settings.get("openWeatherApiKey")
+    city, country, open_weather_api_key = weather_location()
     
     if not open_weather_api_key:
-        app.logger.warning("Weather request missing API key")
+        logger.warning("Weather request missing API key")
         return jsonify({"status": "error", "message": "OpenWeather API key is missing"}), 400
     
     try:
-        # Get weather data from the service
-        weather_data = weather_service.get_weather_for_location(
+        # Keep this location prefetched so requests are answered from a fresh cache
+        weather_prefetcher.register_location(city, country, open_weather_api_key, config.WEATHER_UNITS)
+        weather_prefetcher.start()
+        
+        # Get the pre-serialized weather payload from the service
+        payload, error = weather_service.get_weather_payload(
             city, 
             country, 
             open_weather_api_key,
             config.WEATHER_UNITS
         )
         
-        return jsonify(weather_data)
+        if error:
+            return jsonify({"status": "error", "message": error})
+        
+        # Kiosks polling an unchanged forecast get a bodyless 304
+        if payload.etag in request.if_none_match:
+            return Response(status=304, headers={"ETag": f'"{payload.etag}"'})
+            
+        response = Response(payload.body, mimetype="application/json")
+        response.set_etag(payload.etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     
     except Exception as e:
-        app.logger.error(f"Unexpected error in weather request: {str(e)}")
+        logger.error(f"Unexpected error in weather request: {str(e)}")
         return jsonify({"status": "error", "message": "An unexpected error occurred"}), 500
 
-@app.route('/events')
+@bp.route('/weather/stats')
+def weather_stats():
+    """Get weather cache hit/miss/refresh statistics."""
+    stats = weather_service.stats()
+    stats["prefetch"] = weather_prefetcher.stats()
+    return jsonify(stats)
+
+@bp.route('/events')
 def events():
     """Server-sent events endpoint to notify about data changes."""
-    def watch_for_changes():
-        current_mtime = None
-        current_location = None
-        current_news_source = None
-        
-        while True:
-            try:
-                mtime = os.path.getmtime(config.USER_SETTINGS_FILE)
-                
-                if current_mtime != mtime:
-                    current_mtime = mtime
-                    user_settings = load_user_settings()
-                    
-                    location = (user_settings.get("city", ""), user_settings.get("country", ""))
-                    news_source = user_settings.get("newsSource", "")
-                    
-                    if current_location != location or current_news_source != news_source:
-                        current_location = location
-                        current_news_source = news_source
-                        app.logger.info("Data change detected, notifying clients")
-                        yield "data: update\n\n"
-            
-            except FileNotFoundError:
-                app.logger.warning(f"File not found: {config.USER_SETTINGS_FILE}")
-                yield "data: error\n\n"
-            except Exception as e:
-                app.logger.error(f"Error in SSE: {str(e)}")
-                yield "data: error\n\n"
-                
-            time.sleep(1)
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
     
-    return Response(watch_for_changes(), content_type='text/event-stream')
+    # The server still drains the body of a HEAD response, and the stream never ends
+    body = event_hub.stream(last_event_id) if request.method == 'GET' else ''
+    
+    return Response(
+        body,
+        content_type='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@bp.route('/events/stats')
+def events_stats():
+    """Get event stream subscriber and delivery statistics."""
+    return jsonify(event_hub.stats())
 
-@app.route('/emotion')
+@bp.route('/emotion')
 def emotion():
     """Get the current detected emotion."""
+    emotion_detection = get_emotion_detection()
+    if emotion_detection is None:
+        return jsonify({"status": "error", "message": "Emotion detection is starting"}), 503
+        
     try:
-        emotion_detection.capture_and_predict_emotion()
+        state = emotion_detection.get_state_store().get()
         
-        with open(config.EMOTION_FILE, "r") as f:
-            detected_emotion = f.read().strip()
+        # Detection runs in the background scheduler; every client shares its latest result
+        if state.screen_on and state.emotion_updated_at is None and not config.EMOTION_DETECTOR_EXTERNAL:
+            emotion_detection.get_scheduler().request_refresh(timeout=config.EMOTION_INFERENCE_TIMEOUT)
+            state = emotion_detection.get_state_store().get()
+            
+        if state.screen_on and state.emotion_updated_at is None:
+            return jsonify({"status": "error", "message": "Emotion detection not ready"}), 503
         
-        app.logger.info(f"Emotion detected: {detected_emotion}")
-        return jsonify(emotion=detected_emotion)
+        logger.info(f"Emotion detected: {state.emotion}")
+        return jsonify(emotion_response(state))
     except Exception as e:
-        app.logger.error(f"Error detecting emotion: {str(e)}")
+        logger.error(f"Error detecting emotion: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
-@app.route('/happy_news')
+@bp.route('/emotion/stats')
+def emotion_stats():
+    """Get per-stage timings and face gate skip ratio for emotion detection."""
+    if config.EMOTION_DETECTOR_EXTERNAL:
+        return jsonify({"status": "error", "message": "Emotion detection runs in a separate process"}), 404
+        
+    emotion_detection = get_emotion_detection()
+    if emotion_detection is None:
+        return jsonify({"status": "error", "message": "Emotion detection is starting"}), 503
+        
+    stats = emotion_detection.get_pipeline_stats()
+    stats["scheduler"] = emotion_detection.get_scheduler().stats()
+    return jsonify(stats)
+
+@bp.route('/happy_news')
 def happy_news():
     """Get happy news to display when the user is sad."""
     try:
-        # Get a random happy news entry
-        news_entry = news_service.get_random_happy_news()
+        # Each mirror gets its own no-repeat rotation
+        mirror_id = request.args.get("mirror") or request.remote_addr or "default"
+        topic = request.args.get("topic", "").strip()
+        
+        if topic:
+            news_entry = news_service.get_happy_news_for_topic(topic, mirror_id)
+        else:
+            news_entry = news_service.get_random_happy_news(mirror_id)
         
         if not news_entry:
-            app.logger.warning("No happy news available")
-            return jsonify({"status": "error", "message": "No happy news available"}), 404
+            message = f"No happy news about '{topic}'" if topic else "No happy news available"
+            logger.warning(message)
+            return jsonify({"status": "error", "message": message}), 404
         
-        app.logger.info("Happy news retrieved")
+        logger.info("Happy news retrieved")
         return jsonify(news_entry)
     except Exception as e:
-        app.logger.error(f"Error retrieving happy news: {str(e)}")
+        logger.error(f"Error retrieving happy news: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@bp.route('/happy_news/stats')
+def happy_news_stats():
+    """Get news index entry count and parse time."""
+    return jsonify(news_service.stats())
+
+# Request instrumentation, also used by the ASGI routes that bypass Flask
+def record_request(route, method, status, seconds):
+    route_latency.observe(seconds, route, method)
+    route_requests.inc(route, method, str(status))
+
+@bp.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@bp.after_app_request
+def record_request_metrics(response):
+    started = g.get("request_started")
+    if started is not None and metrics is not None:
+        # Label by URL rule rather than path to keep the number of series bounded
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        record_request(route, request.method, response.status_code, time.perf_counter() - started)
+    return response
+
+def _add_cache_metrics(families, name, stats, hit_keys=("hits",)):
+    """Add one cache's hits, misses and hit ratio to the (hits, misses, ratio) families."""
+    hits_metric, misses_metric, ratio_metric = families
+    hits = sum(stats.get(key, 0) for key in hit_keys)
+    lookups = hits + stats.get("misses", 0)
+    labels = {"cache": name}
+    hits_metric.add(hits, labels)
+    misses_metric.add(stats.get("misses", 0), labels)
+    ratio_metric.add(round(hits / lookups, 4) if lookups else None, labels)
+
+# Collected from the services' stats() on each scrape
+def collect_service_metrics():
+    collected = []
+    
+    hub = event_hub.stats()
+    collected += [
+        gauge("mirror_sse_subscribers", "Connected event stream clients", hub["subscribers"]),
+        counter("mirror_sse_events_published_total", "Events published to event streams", hub["published"]),
+        counter("mirror_sse_overflows_total", "Event stream clients dropped for falling behind", hub["overflows"])
+    ]
+    
+    weather = weather_service.stats()
+    caches = (counter("mirror_cache_hits_total", "Cache hits"),
+              counter("mirror_cache_misses_total", "Cache misses"),
+              gauge("mirror_cache_hit_ratio", "Cache hits per lookup"))
+    _add_cache_metrics(caches, "weather", weather["weather_cache"], ("hits", "stale_hits"))
+    if "geocode_cache" in weather:
+        _add_cache_metrics(caches, "geocode", weather["geocode_cache"])
+    collected += caches
+        
+    upstream_latency = Metric("mirror_upstream_request_duration_seconds", "histogram", "Upstream API call latency")
+    upstream_requests = counter("mirror_upstream_requests_total", "Upstream API calls, including retries")
+    upstream_errors = counter("mirror_upstream_errors_total", "Upstream API calls that failed or returned 5xx")
+    upstream_rejected = counter("mirror_upstream_rejected_total", "Upstream API calls refused by an open circuit")
+    upstream_open = gauge("mirror_upstream_circuit_open", "Whether the upstream's circuit breaker is open")
+    for endpoint, stats in weather["upstreams"].items():
+        labels = {"endpoint": endpoint}
+        upstream_latency.add_histogram(stats["latency"], labels)
+        upstream_requests.add(stats["requests"], labels)
+        upstream_errors.add(stats["errors"], labels)
+        upstream_rejected.add(stats["rejected"], labels)
+        upstream_open.add(stats["circuit"] != "closed", labels)
+    collected += [upstream_latency, upstream_requests, upstream_errors, upstream_rejected, upstream_open]
+    
+    news = news_service.stats()
+    collected += [
+        gauge("mirror_news_entries", "Happy news entries indexed", news["index"]["entries"]),
+        counter("mirror_news_index_rebuilds_total", "Full rebuilds of the news index", news["index"]["rebuilds"]),
+        counter("mirror_news_draws_total", "Happy news entries served", news["sampler"]["draws"]),
+        counter("mirror_news_search_queries_total", "Topic and keyword searches", news["search"]["queries"])
+    ]
+    
+    settings = settings_store.stats()
+    collected.append(counter("mirror_settings_writes_total", "User settings writes", settings["writes"]))
+    
+    log = logging_stats()
+    collected += [
+        counter("mirror_log_records_total", "Log records written", log.get("records")),
+        counter("mirror_log_dropped_total", "Log records dropped because the writer fell behind", log.get("dropped")),
+        counter("mirror_log_suppressed_total", "Log records dropped by per-call-site rate limiting", log["suppressed"])
+    ]
+    
+    progress = emotion_loader.progress()
+    collected.append(gauge("mirror_emotion_ready", "Whether emotion detection is loaded", progress["state"] == "ready"))
+    
+    emotion_detection = get_emotion_detection()
+    if emotion_detection is not None and not config.EMOTION_DETECTOR_EXTERNAL:
+        pipeline = emotion_detection.get_pipeline_stats()
+        stages = Metric("mirror_emotion_stage_duration_seconds", "histogram", "Emotion pipeline time per stage")
+        for stage, snapshot in pipeline["stages"].items():
+            stages.add_histogram(snapshot, {"stage": stage})
+        scheduler = emotion_detection.get_scheduler().stats()
+        collected += [
+            stages,
+            counter("mirror_emotion_cycles_total", "Emotion detection cycles run", scheduler["cycles_completed"]),
+            counter("mirror_emotion_cycles_skipped_total", "Emotion detection cycles skipped", scheduler["cycles_skipped"])
+        ]
+        
+    return collected
+
+@bp.route('/metrics')
+def prometheus_metrics():
+    """Metrics in the Prometheus text format."""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
 # Health check endpoint
-@app.route('/health')
+@bp.route('/health')
 def health_check():
     """Health check endpoint for monitoring."""
     return jsonify({
         "status": "healthy",
         "version": config.VERSION,
-        "timestamp": time.time()
+        "timestamp": time.time(),
+        "emotion_detection": emotion_loader.progress() if emotion_loader is not None else None
     })
 
-# Application initialization
-if __name__ == '__main__':
+# Application factory
+def create_app(start_background=True):
+    """
+    Create the Flask application.
+    
+    Args:
+        start_background: Start weather prefetching, the event hub and emotion detection
+        
+    Returns:
+        The configured Flask application
+    """
+    started = time.perf_counter()
+    init_services()
+    
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+    
     setup_logging()
+    logger.info(f"Startup imports took {startup_imports.total:.2f}s ({startup_imports.summary()})")
     ensure_files_exist()
-    app.logger.info('Starting Smart Mirror application')
+    
+    if start_background:
+        start_weather_prefetch()
+        start_event_hub()
+        # The port is bound right away; /health reports the emotion stack's progress
+        emotion_loader.start()
+        
+    logger.info(f"Application created in {time.perf_counter() - started:.2f}s")
+    return app
+
+# Application initialization
+if __name__ == '__main__':
+    # With the debug reloader on, this process only watches files and a child process serves
+    # requests; only the child may open the camera and load the model
+    serving_process = not config.DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+    app = create_app(start_background=serving_process)
+    logger.info('Starting Smart Mirror application')
     app.run(debug=config.DEBUG, host=config.HOST, port=config.PORT)
\ No newline at end of file
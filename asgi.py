@@ -0,0 +1,209 @@
+"""
+Production ASGI entry point.
+
+Run with:
+    uvicorn --factory asgi:create_asgi_app --host 0.0.0.0 --port 8000
+
+/events, /weather and /emotion are served natively on the event loop, so an
+idle event stream or a request waiting on the weather provider or on emotion
+detection does not hold a thread. Every other route is handed to the Flask
+application through asgiref's WSGI adapter.
+"""
+import json
+import time
+import asyncio
+import logging
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+
+import config
+import app as mirror
+
+logger = logging.getLogger(__name__)
+
+class MirrorASGI:
+    """ASGI application with async hot paths in front of the Flask app."""
+
+    def __init__(self, flask_app):
+        """
+        Initialize the ASGI application.
+
+        Args:
+            flask_app: Application from app.create_app(), serving everything else
+        """
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.routes = {
+            "/events": self.events,
+            "/weather": self.weather,
+            "/emotion": self.emotion
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http" and scope["method"] in ("GET", "HEAD") and scope["path"] in self.routes:
+            await self.routes[scope["path"]](scope, receive, self._timed_send(scope, send))
+        else:
+            await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        """Acknowledge startup and shutdown; services are started by create_app()."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    def _timed_send(scope, send):
+        """Wrap send to record the route's metrics when the response starts, as the Flask routes do."""
+        started = time.perf_counter()
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                mirror.record_request(scope["path"], scope["method"], message["status"], time.perf_counter() - started)
+            await send(message)
+
+        return timed_send
+
+    @staticmethod
+    def _headers(scope):
+        return {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+
+    @staticmethod
+    def _query(scope):
+        return {key: values[0] for key, values in parse_qs(scope["query_string"].decode("latin-1")).items()}
+
+    @staticmethod
+    async def _respond(send, status, body=b"", content_type="application/json", headers=()):
+        """Send a complete response."""
+        response_headers = [(b"content-type", content_type.encode())] + [
+            (name.encode(), value.encode()) for name, value in headers
+        ]
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _respond_json(self, send, status, data):
+        await self._respond(send, status, json.dumps(data).encode("utf-8"))
+
+    async def events(self, scope, receive, send):
+        """Server-sent events, one suspended coroutine per idle client."""
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no")
+            ]
+        })
+
+        # HEAD gets the stream's headers only; opening a stream for it would never end
+        if scope["method"] != "GET":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        last_event_id = self._headers(scope).get("last-event-id") or self._query(scope).get("lastEventId")
+
+        stream = mirror.event_hub.astream(last_event_id)
+        disconnected = asyncio.ensure_future(self._wait_for_disconnect(receive))
+
+        try:
+            while True:
+                # Wait for the next event and the client going away at the same time
+                next_chunk = asyncio.ensure_future(stream.__anext__())
+                await asyncio.wait({next_chunk, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+
+                if not next_chunk.done():
+                    # Let the cancellation unwind the stream before it is closed
+                    next_chunk.cancel()
+                    await asyncio.wait({next_chunk})
+                    break
+
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    break
+
+                await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+        except OSError:
+            pass
+        finally:
+            disconnected.cancel()
+            await stream.aclose()
+
+    @staticmethod
+    async def _wait_for_disconnect(receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def weather(self, scope, receive, send):
+        """Weather for the configured location, fetched without blocking the event loop."""
+        city, country, api_key = mirror.weather_location()
+
+        if not api_key:
+            logger.warning("Weather request missing API key")
+            await self._respond_json(send, 400, {"status": "error", "message": "OpenWeather API key is missing"})
+            return
+
+        try:
+            mirror.weather_prefetcher.start()
+            payload, error = await mirror.weather_prefetcher.get_weather_payload(
+                city, country, api_key, config.WEATHER_UNITS
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error in weather request: {str(e)}")
+            await self._respond_json(send, 500, {"status": "error", "message": "An unexpected error occurred"})
+            return
+
+        if error:
+            await self._respond_json(send, 200, {"status": "error", "message": error})
+            return
+
+        etag = f'"{payload.etag}"'
+        if_none_match = self._headers(scope).get("if-none-match", "")
+        if etag in [tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")]:
+            await self._respond(send, 304, headers=[("etag", etag)])
+            return
+
+        await self._respond(send, 200, payload.body, headers=[("etag", etag), ("cache-control", "no-cache")])
+
+    async def emotion(self, scope, receive, send):
+        """Latest emotion; waiting for a first detection happens off the event loop."""
+        loop = asyncio.get_running_loop()
+        emotion_detection = mirror.get_emotion_detection()
+
+        if emotion_detection is None:
+            await self._respond_json(send, 503, {"status": "error", "message": "Emotion detection is starting"})
+            return
+
+        try:
+            store = emotion_detection.get_state_store()
+            # StateClient reads over a socket; the local store is in memory
+            state = await loop.run_in_executor(None, store.get) if config.EMOTION_DETECTOR_EXTERNAL else store.get()
+
+            if state.screen_on and state.emotion_updated_at is None and not config.EMOTION_DETECTOR_EXTERNAL:
+                scheduler = emotion_detection.get_scheduler()
+                await loop.run_in_executor(None, scheduler.request_refresh, config.EMOTION_INFERENCE_TIMEOUT)
+                state = store.get()
+
+            if state.screen_on and state.emotion_updated_at is None:
+                await self._respond_json(send, 503, {"status": "error", "message": "Emotion detection not ready"})
+                return
+
+            await self._respond_json(send, 200, mirror.emotion_response(state))
+        except Exception as e:
+            logger.error(f"Error detecting emotion: {str(e)}")
+            await self._respond_json(send, 500, {"status": "error", "message": str(e)})
+
+def create_asgi_app():
+    """
+    Create the ASGI application.
+
+    Returns:
+        MirrorASGI wrapping a fully started Flask application
+    """
+    return MirrorASGI(mirror.create_app())
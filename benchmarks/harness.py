@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import time
+import math
+import platform
+import resource
+import threading
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+# Per-scenario fields compared against the baseline, and whether higher is better
+COMPARED_FIELDS = {"p50": False, "p95": False, "p99": False, "throughput": True}
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, Any]:
+    """
+    Summarize one scenario's latencies.
+
+    Args:
+        latencies: Seconds per successful operation
+        elapsed: Wall-clock seconds the scenario ran for
+        errors: Failed operations
+
+    Returns:
+        Dictionary with count, errors, throughput (ops/s) and p50/p95/p99/mean/max in milliseconds
+    """
+    values = sorted(latencies)
+
+    def ms(seconds):
+        return round(seconds * 1000, 3) if seconds is not None else None
+
+    return {
+        "count": len(values),
+        "errors": errors,
+        "throughput": round(len(values) / elapsed, 2) if elapsed > 0 else None,
+        "p50": ms(percentile(values, 0.50)),
+        "p95": ms(percentile(values, 0.95)),
+        "p99": ms(percentile(values, 0.99)),
+        "mean": ms(sum(values) / len(values)) if values else None,
+        "max": ms(values[-1]) if values else None
+    }
+
+def run_clients(operation: Callable[[int], None], clients: int, requests_per_client: int) -> Dict[str, Any]:
+    """
+    Run an operation from many concurrent client threads.
+
+    Args:
+        operation: Called with the client number; raises on failure
+        clients: Number of concurrent client threads
+        requests_per_client: Operations each client performs
+
+    Returns:
+        Scenario summary (see summarize())
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start = threading.Barrier(clients + 1)
+
+    def client(number):
+        own, failed = [], 0
+        start.wait()
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            try:
+                operation(number)
+                own.append(time.perf_counter() - started)
+            except Exception:
+                failed += 1
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+
+    return summarize(latencies, time.perf_counter() - started, errors[0])
+
+def rss_mb() -> Dict[str, Optional[float]]:
+    """Current and peak resident set size of this process in MiB."""
+    current = None
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    current = round(int(line.split()[1]) / 1024, 1)
+                    break
+    except OSError:
+        pass
+
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return {"current": current, "peak": round(peak, 1)}
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine so results from different hosts are not compared blindly."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = 0.2) -> Tuple[List[str], List[str]]:
+    """
+    Compare scenario results against a baseline run.
+
+    Args:
+        results: This run's "scenarios" dictionary
+        baseline: The baseline run's "scenarios" dictionary
+        tolerance: Relative change allowed before a field counts as a regression
+
+    Returns:
+        (report lines, regressions) tuple
+    """
+    lines, regressions = [], []
+
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            lines.append(f"{scenario}: no baseline")
+            continue
+
+        for field, higher_is_better in COMPARED_FIELDS.items():
+            now, then = current.get(field), previous.get(field)
+            if now is None or not then:
+                continue
+
+            change = (now - then) / then
+            worse = -change if higher_is_better else change
+            marker = "REGRESSION" if worse > tolerance else ""
+            lines.append(f"{scenario} {field}: {then} -> {now} ({change:+.1%}) {marker}".rstrip())
+            if marker:
+                regressions.append(f"{scenario} {field}")
+
+    return lines, regressions
+
+def load_json(path: str) -> Optional[Dict[str, Any]]:
+    """Read a results file, or None if it does not exist."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_json(path: str, data: Dict[str, Any]):
+    """Write a results file."""
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
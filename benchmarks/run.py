@@ -0,0 +1,296 @@
+"""
+Reproducible benchmarks for the emotion pipeline and the HTTP hot paths.
+
+Run from the repository root:
+    python -m benchmarks.run [--frames DIR_OR_VIDEO] [--scenarios emotion,weather,...]
+
+Every run uses a scratch data directory, a local stub for the OpenCage and
+OpenWeather APIs and a generated news corpus, so results only depend on the
+code and the machine. Results are written as JSON and compared against a
+stored baseline (see --save-baseline).
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+
+import requests
+from werkzeug.serving import make_server
+
+import config
+from benchmarks.harness import summarize, run_clients, rss_mb, environment, compare, load_json, save_json
+from benchmarks.stub_upstreams import StubUpstreams
+
+logger = logging.getLogger("benchmarks")
+
+SCENARIOS = ("emotion", "weather_cold", "weather", "happy_news", "happy_news_topic", "events")
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+API_KEY = "benchmark-key"
+
+def isolate_config(work_dir, args, stub):
+    """Point every data and log path into the scratch directory and the APIs at the stub."""
+    data_dir, logs_dir = config.DATA_DIR, config.LOGS_DIR
+
+    for name, value in list(vars(config).items()):
+        if name.isupper() and isinstance(value, str):
+            if value.startswith(data_dir):
+                setattr(config, name, os.path.join(work_dir, "data") + value[len(data_dir):])
+            elif value.startswith(logs_dir):
+                setattr(config, name, os.path.join(work_dir, "logs") + value[len(logs_dir):])
+
+    config.DEBUG = False
+    config.EMOTION_DETECTOR_EXTERNAL = False
+    config.SAVE_CAPTURED_IMAGES = False
+    config.LOG_CONSOLE = False
+    config.CAMERA_SOURCES = [args.frames]
+    config.OPENCAGE_API_URL = stub.geocode_url
+    config.OPENWEATHER_API_URL = stub.weather_url
+    config.ensure_directories()
+
+def write_news_corpus(path, entries, seed=7):
+    """Generate a news file with topic words sprinkled in, so topic searches have matches."""
+    from utils.news_ingest import format_entry
+    from utils.news import NewsEntry
+    from utils.news_search import TOPIC_KEYWORDS
+
+    rng = random.Random(seed)
+    words = [word for keywords in TOPIC_KEYWORDS.values() for word in keywords]
+    filler = "good people made the day brighter for everyone around them".split()
+
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(entries):
+            title = " ".join(rng.choice(words + filler) for _ in range(8)).capitalize()
+            description = " ".join(rng.choice(words + filler * 3) for _ in range(40))
+            f.write(format_entry(NewsEntry(f"{title} {i}", description, "Mon, 08 May 2023 16:00:54 +0000")))
+
+def bench_emotion(args):
+    """Replay the recorded frames through capture_and_predict_emotion()."""
+    import emotion_detection
+
+    emotion_detection.warm_up().result(timeout=300)
+
+    latencies, errors = [], 0
+    started = time.perf_counter()
+
+    for _ in range(args.emotion_runs):
+        call_started = time.perf_counter()
+        emotion = emotion_detection.capture_and_predict_emotion()
+        if emotion == "error":
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - call_started)
+
+    result = summarize(latencies, time.perf_counter() - started, errors)
+    pipeline = emotion_detection.get_pipeline_stats()
+    result["stages"] = {key: value for key, value in pipeline.items() if key.startswith("avg_")}
+    return result
+
+def bench_weather_cold(args, mirror):
+    """Uncached lookups of distinct places, each a geocode and a weather call to the stub."""
+    latencies, errors = [], 0
+    started = time.perf_counter()
+
+    for i in range(args.weather_places):
+        call_started = time.perf_counter()
+        payload, error = mirror.weather_service.get_weather_payload(
+            f"Benchmark City {i}", "RO", API_KEY, config.WEATHER_UNITS)
+        if error:
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - call_started)
+
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+def http_scenario(base_url, path_for_client, args):
+    """Load-test a GET route with one keep-alive session per client, after one warm-up request."""
+    local = threading.local()
+    requests.get(base_url + path_for_client(0), timeout=30)
+
+    def operation(client):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        response = session.get(base_url + path_for_client(client), timeout=30)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+
+    return run_clients(operation, args.clients, args.requests)
+
+def bench_events(args, base_url, mirror):
+    """Deliver events to many connected /events clients and time publish-to-receive."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    done = threading.Barrier(args.sse_clients + 1)
+
+    def client():
+        received = []
+        try:
+            with requests.get(base_url + "/events", stream=True, timeout=30) as response:
+                for line in response.iter_lines(decode_unicode=True):
+                    if line and line.startswith("data: ") and line != "data: update":
+                        sent = json.loads(line[6:]).get("sent")
+                        if sent is not None:
+                            received.append(time.perf_counter() - sent)
+                    if len(received) >= args.sse_events:
+                        break
+        except Exception:
+            with lock:
+                errors[0] += 1
+        with lock:
+            latencies.extend(received)
+        done.wait()
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(args.sse_clients)]
+    for thread in threads:
+        thread.start()
+
+    # Publish only once every client is subscribed
+    deadline = time.monotonic() + 30
+    while mirror.event_hub.stats()["subscribers"] < args.sse_clients and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    started = time.perf_counter()
+    for _ in range(args.sse_events):
+        mirror.event_hub.publish("benchmark", {"sent": time.perf_counter()})
+        time.sleep(args.sse_interval)
+
+    done.wait(timeout=60)
+    return summarize(latencies, time.perf_counter() - started, errors[0])
+
+def run(args):
+    work_dir = tempfile.mkdtemp(prefix="mirror-bench-")
+    stub = StubUpstreams(args.upstream_latency, args.upstream_jitter).start()
+    scenarios = {}
+
+    try:
+        isolate_config(work_dir, args, stub)
+        write_news_corpus(config.HAPPY_NEWS_FILE, args.news_entries)
+
+        if "emotion" in args.scenarios:
+            logger.info(f"emotion: {args.emotion_runs} runs from {args.frames}")
+            scenarios["emotion"] = bench_emotion(args)
+
+        import app as mirror
+
+        flask_app = mirror.create_app(start_background=False)
+        mirror.settings_store.update({"city": "Bucharest", "country": "RO", "openWeatherApiKey": API_KEY})
+
+        server = make_server("127.0.0.1", 0, flask_app, threaded=True)
+        threading.Thread(target=server.serve_forever, name="bench-server", daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        try:
+            if "weather_cold" in args.scenarios:
+                logger.info(f"weather_cold: {args.weather_places} places")
+                scenarios["weather_cold"] = bench_weather_cold(args, mirror)
+
+            if "weather" in args.scenarios:
+                logger.info(f"weather: {args.clients} clients x {args.requests} requests")
+                scenarios["weather"] = http_scenario(base_url, lambda client: "/weather", args)
+
+            if "happy_news" in args.scenarios:
+                logger.info(f"happy_news: {args.clients} clients x {args.requests} requests")
+                scenarios["happy_news"] = http_scenario(
+                    base_url, lambda client: f"/happy_news?mirror=bench-{client}", args)
+
+            if "happy_news_topic" in args.scenarios:
+                logger.info(f"happy_news_topic: {args.clients} clients x {args.requests} requests")
+                scenarios["happy_news_topic"] = http_scenario(
+                    base_url, lambda client: f"/happy_news?mirror=bench-{client}&topic=animals", args)
+
+            if "events" in args.scenarios:
+                logger.info(f"events: {args.sse_clients} clients x {args.sse_events} events")
+                scenarios["events"] = bench_events(args, base_url, mirror)
+        finally:
+            server.shutdown()
+    finally:
+        stub_stats = stub.stats()
+        stub.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "environment": environment(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "scenarios": scenarios,
+        "rss_mb": rss_mb(),
+        "upstreams": stub_stats
+    }
+
+def main(argv=None) -> int:
+    """Command line entry point: python -m benchmarks.run."""
+    parser = argparse.ArgumentParser(description="Benchmark the emotion pipeline and the HTTP hot paths")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--frames", default="synthetic",
+                        help="Directory of recorded frames, a video file, or 'synthetic'")
+    parser.add_argument("--emotion-runs", type=int, default=50, help="capture_and_predict_emotion() calls")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="Stub API latency in seconds")
+    parser.add_argument("--upstream-jitter", type=float, default=0.0, help="Extra random stub latency in seconds")
+    parser.add_argument("--weather-places", type=int, default=20, help="Distinct places for weather_cold")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent HTTP clients")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per HTTP client")
+    parser.add_argument("--news-entries", type=int, default=10000, help="Generated news corpus size")
+    parser.add_argument("--sse-clients", type=int, default=200, help="Concurrent /events clients")
+    parser.add_argument("--sse-events", type=int, default=50, help="Events published to them")
+    parser.add_argument("--sse-interval", type=float, default=0.02, help="Seconds between published events")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Results JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative change counted as a regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # The app keeps logging at its configured level to its log file; only warnings reach the console
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(config.LOG_FORMAT, config.LOG_DATE_FORMAT))
+    console.setLevel(logging.WARNING)
+    logging.getLogger().addHandler(console)
+
+    progress = logging.StreamHandler()
+    progress.setFormatter(logging.Formatter(config.LOG_FORMAT, config.LOG_DATE_FORMAT))
+    logger.addHandler(progress)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    # Werkzeug installs its own access log handler unless its level hides it
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    results = run(args)
+    save_json(args.output, results)
+    print(json.dumps(results["scenarios"], indent=2))
+    print(f"RSS: {results['rss_mb']}  Results written to {args.output}")
+
+    if args.save_baseline:
+        save_json(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_json(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; store one with --save-baseline")
+        return 0
+
+    lines, regressions = compare(results["scenarios"], baseline.get("scenarios", {}), args.tolerance)
+    print("\n".join(lines))
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
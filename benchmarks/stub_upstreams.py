@@ -0,0 +1,138 @@
+import json
+import time
+import random
+import zlib
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+from urllib.parse import urlparse, parse_qs
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+GEOCODE_PATH = "/geocode/v1/json"
+WEATHER_PATH = "/data/3.0/onecall"
+
+WEATHER_RESPONSE = {
+    "lat": 44.4268,
+    "lon": 26.1025,
+    "timezone": "Europe/Bucharest",
+    "current": {
+        "dt": 1700000000,
+        "temp": 18.4,
+        "feels_like": 17.9,
+        "humidity": 60,
+        "wind_speed": 3.1,
+        "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}]
+    }
+}
+
+class StubUpstreams:
+    """Local stand-in for the OpenCage and OpenWeather APIs with configurable latency."""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the stub server.
+
+        Args:
+            latency: Seconds each response is delayed by
+            jitter: Up to this many extra seconds added at random
+            error_rate: Fraction of requests answered with HTTP 503
+            host: Interface to listen on
+            port: Port to listen on, 0 for any free port
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+        self._lock = threading.Lock()
+        self._requests = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def geocode_url(self) -> str:
+        return self.url + GEOCODE_PATH
+
+    @property
+    def weather_url(self) -> str:
+        return self.url + WEATHER_PATH
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                path = url.path
+                stub._count(path)
+                time.sleep(stub.latency + random.uniform(0, stub.jitter))
+
+                if path == GEOCODE_PATH:
+                    body = stub.geocode(parse_qs(url.query).get("q", [""])[0])
+                elif path == WEATHER_PATH:
+                    body = WEATHER_RESPONSE
+                else:
+                    self.send_error(404)
+                    return
+
+                if stub.error_rate and random.random() < stub.error_rate:
+                    self.send_error(503)
+                    return
+
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @staticmethod
+    def geocode(query: str) -> Dict[str, Any]:
+        """Stable made-up coordinates per place, so distinct places are cached separately."""
+        digest = zlib.crc32(query.encode("utf-8"))
+        latitude = (digest % 18000) / 100 - 90
+        longitude = (digest // 18000 % 36000) / 100 - 180
+        return {"results": [{"geometry": {"lat": latitude, "lng": longitude}}]}
+
+    def _count(self, path: str):
+        with self._lock:
+            self._requests[path] = self._requests.get(path, 0) + 1
+
+    def start(self) -> "StubUpstreams":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-upstreams", daemon=True)
+        self._thread.start()
+        logger.info(f"Stub upstreams listening on {self.url} (latency {self.latency * 1000:.0f}ms)")
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get request counts.
+
+        Returns:
+            Dictionary with requests received per API
+        """
+        with self._lock:
+            return {
+                "geocode_requests": self._requests.get(GEOCODE_PATH, 0),
+                "weather_requests": self._requests.get(WEATHER_PATH, 0)
+            }
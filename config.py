@@ -11,16 +11,25 @@ BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = os.path.join(BASE_DIR, "data")
 LOGS_DIR = os.path.join(BASE_DIR, "logs")
 
-# Ensure directories exist
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(LOGS_DIR, exist_ok=True)
+# Create the data and logs directories (called at startup, not on import)
+def ensure_directories():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(LOGS_DIR, exist_ok=True)
 
 # File paths
 USER_SETTINGS_FILE = os.path.join(DATA_DIR, "user_settings.json")
-EMOTION_FILE = os.path.join(DATA_DIR, "emotion.txt")
+STATE_FILE = os.path.join(DATA_DIR, "mirror_state.json")
 HAPPY_NEWS_FILE = os.path.join(DATA_DIR, "happy_news.txt")
+NEWS_SAMPLER_FILE = os.path.join(DATA_DIR, "news_sampler.json")
 SCREEN_OPERATION_FILE = os.path.join(DATA_DIR, "screen_operation.txt")
 CAPTURED_IMAGE_FILE = os.path.join(DATA_DIR, "captured_image.jpg")
+GEOCODE_CACHE_FILE = os.path.join(DATA_DIR, "geocode_cache.json")
+
+# Shared state settings
+STATE_FLUSH_INTERVAL = 5  # Seconds between crash-recovery snapshots of the state
+STATE_SOCKET_PATH = os.environ.get("STATE_SOCKET_PATH", os.path.join(DATA_DIR, "mirror_state.sock"))
+# Set when emotion detection runs as its own process (python emotion_detection.py --serve)
+EMOTION_DETECTOR_EXTERNAL = os.environ.get("EMOTION_DETECTOR_EXTERNAL", "False").lower() == "true"
 
 # API Keys - For production, load these from environment variables
 OPENCAGE_API_KEY = os.environ.get("OPENCAGE_API_KEY", "7edad7fb766d4888b829859f0ade0b70")
@@ -31,11 +40,44 @@ DEFAULT_COUNTRY = "UK"
 DEFAULT_NEWS_SOURCE = "BBC News"
 
 # Emotion detection settings
-SAD_THRESHOLD = 40  # Threshold for "sad" emotion probability
+SAD_THRESHOLD = 40  # Smoothed "sad" probability needed to enter the sad state
+SAD_EXIT_THRESHOLD = 30  # Smoothed "sad" probability below which the sad state is left
+EMOTION_SMOOTHING_ALPHA = 0.4  # Weight of the newest frame in the moving average
+EMOTION_SMOOTHING_RESET_AFTER = 300  # Seconds without a face before the average is discarded
 EMOTION_DETECTION_INTERVAL = 30  # Seconds between emotion detection runs
+EMOTION_IDLE_BACKOFF_AFTER = 120  # Seconds without a face before detection backs off
+EMOTION_MAX_DETECTION_INTERVAL = 300  # Upper bound for the backed-off interval
 QUESTION_TIMEOUT = 10  # Seconds to display question before hiding
 HAPPY_NEWS_DISPLAY_TIME = 120  # Seconds to display happy news
 NEWS_COOLDOWN_PERIOD = 600  # Seconds (10 minutes) before asking again
+NEWS_USE_MMAP = os.environ.get("NEWS_USE_MMAP", "False").lower() == "true"  # Memory-map large news corpora
+NEWS_RECENCY_HALF_LIFE = None  # Days after which a news entry is half as likely to be shown (None: no weighting)
+
+# Camera settings
+CAMERA_SOURCE = int(os.environ.get("CAMERA_SOURCE", 0))  # OpenCV device index
+# Comma-separated device indexes, video files/URLs, directories of recorded frames or "synthetic"; the first is the primary camera
+CAMERA_SOURCES = os.environ.get("CAMERA_SOURCES", str(CAMERA_SOURCE)).split(",")
+CAMERA_BUFFER_SIZE = 5  # Number of recent frames kept in memory
+CAMERA_FRAME_TIMEOUT = 3  # Seconds to wait for the first frame after startup
+CAMERA_MAX_FRAME_AGE = 2  # Seconds before a buffered frame is considered stale
+SAVE_CAPTURED_IMAGES = os.environ.get("SAVE_CAPTURED_IMAGES", "False").lower() == "true"  # Debug copy in CAPTURED_IMAGE_FILE
+
+# Emotion inference settings
+EMOTION_USE_PROCESS_POOL = os.environ.get("EMOTION_USE_PROCESS_POOL", "False").lower() == "true"
+EMOTION_DETECTOR_BACKEND = "opencv"  # DeepFace face detector backend
+EMOTION_INFERENCE_TIMEOUT = 15  # Seconds to wait for an emotion analysis
+EMOTION_FACE_GATE = True  # Only run the emotion model when a face is found by a cheap pre-stage
+FACE_GATE_WIDTH = 320  # Frame width used for motion and face presence detection
+FACE_GATE_MOTION_THRESHOLD = 0.01  # Fraction of changed pixels that counts as motion (0 disables)
+FACE_ROI_SIZE = 224  # Side length of the face crop passed to the emotion model
+EMOTION_BATCH_WINDOW = 0.05  # Seconds to collect face crops from all cameras into one batch
+EMOTION_MAX_BATCH_SIZE = 8  # Largest batch passed to the emotion model at once
+
+# Server-sent events settings
+SSE_HEARTBEAT_INTERVAL = 15  # Seconds of silence before a keep-alive comment is sent
+SSE_QUEUE_SIZE = 64  # Events buffered per client before a slow client is disconnected
+SSE_HISTORY_SIZE = 256  # Recent events kept for Last-Event-ID resume
+SETTINGS_POLL_INTERVAL = 2  # Seconds between checks for external edits of the settings file
 
 # Flask settings
 DEBUG = os.environ.get("DEBUG", "True").lower() == "true"
@@ -48,8 +90,20 @@ LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 LOG_FILE_MAX_BYTES = 10485760  # 10MB
 LOG_FILE_BACKUP_COUNT = 5
+LOG_JSON = os.environ.get("LOG_JSON", "False").lower() == "true"  # Write log files as JSON lines
+LOG_CONSOLE = os.environ.get("LOG_CONSOLE", "True").lower() == "true"  # Also log to stderr
+LOG_RATE_LIMIT = 1.0  # INFO/DEBUG lines per second per call site, after a burst; None disables
+LOG_RATE_BURST = 10
+LOG_RATE_EXEMPT = ["werkzeug"]  # Loggers never rate limited, e.g. the per-request access log
+LOG_FLUSH_INTERVAL = 0.5  # Seconds the log writer batches records before flushing
 
 # Weather API settings
 WEATHER_UNITS = "metric"  # Options: metric, imperial
 WEATHER_REFRESH_INTERVAL = 600  # Seconds (10 minutes)
-WEATHER_API_TIMEOUT = 10  # Seconds
\ No newline at end of file
+WEATHER_API_TIMEOUT = 10  # Seconds
+WEATHER_MAX_CONCURRENCY = 4  # Upstream calls in flight at once when prefetching
+# Extra locations to keep prefetched besides the configured one, e.g. "London,UK;Paris,France"
+WEATHER_LOCATIONS = [loc.split(",", 1) for loc in os.environ.get("WEATHER_LOCATIONS", "").split(";") if "," in loc]
+# Upstream endpoints, overridable to point at local stub servers
+OPENCAGE_API_URL = os.environ.get("OPENCAGE_API_URL", "https://api.opencagedata.com/geocode/v1/json")
+OPENWEATHER_API_URL = os.environ.get("OPENWEATHER_API_URL", "https://api.openweathermap.org/data/3.0/onecall")
\ No newline at end of file
@@ -1,102 +1,272 @@
-import cv2
-import os
+import time
 import logging
-from deepface import DeepFace
-from pathlib import Path
+import threading
+from concurrent.futures import Future
 
-# Configuration
-SCREEN_OPERATION_FILE = "screen_operation.txt"
-EMOTION_FILE = "emotion.txt"
-CAPTURED_IMAGE_FILE = "captured_image.jpg"
-SAD_THRESHOLD = 40  # Threshold for "sad" emotion probability
+import config
+from utils.camera import CameraStream, FrameRecorder, parse_source
+from utils.emotion_engine import EmotionEngine, BatchCollector
+from utils.emotion_scheduler import EmotionScheduler, SCREEN_OFF_EMOTION
+from utils.face_gate import FaceGate
+from utils.emotion_smoothing import EmotionSmoother
+from utils.state_store import StateStore, StateClient
+from utils.metrics import LatencyHistogram
+from utils.log_pipeline import configure_from_config
 
-# Setup logging
+# Setup logger; handlers are set up by the entry point (app.setup_logging or serve_forever)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-# Create logs directory if it doesn't exist
-if not os.path.exists('logs'):
-    os.makedirs('logs')
+# Shared state (screen, last emotion), held in memory
+_state_store = None
+_state_store_lock = threading.Lock()
 
-# Add handler to the logger
-handler = logging.FileHandler('logs/emotion_detection.log')
-handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-logger.addHandler(handler)
+# Shared camera streams, opened once for the life of the process
+_cameras = None
+_camera_lock = threading.Lock()
 
-def capture_image():
+# Shared inference engine, keeps the emotion model loaded
+_engine = None
+_batcher = None
+_engine_lock = threading.Lock()
+
+# Optional debug sink for captured frames
+_recorder = None
+_recorder_lock = threading.Lock()
+
+# Periodic detection shared by all clients
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+# Face-presence pre-stage per source, skips inference when nobody is in front of the mirror
+_face_gates = {}
+_face_gate_failed = False
+_face_gate_lock = threading.Lock()
+
+# Smoothed emotion estimate per source across detection cycles
+_smoothers = {}
+_smoother_lock = threading.Lock()
+
+# Per-stage timing histograms: capture, face gate (pre-processing) and inference
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_stage_timings = {stage: LatencyHistogram(STAGE_BUCKETS) for stage in ("capture", "gate", "inference")}
+
+def _record_stage(stage, seconds):
+    """Record the time spent in one pipeline stage."""
+    _stage_timings[stage].observe(seconds)
+
+def get_state_store():
     """
-    Capture an image from the webcam.
+    Get the shared state store.
+    
+    When detection runs in a separate process, this is a read-only client
+    of the store that process serves on STATE_SOCKET_PATH.
+    
+    Returns:
+        StateStore or StateClient: The shared state
+    """
+    global _state_store
+    
+    with _state_store_lock:
+        if _state_store is None:
+            if config.EMOTION_DETECTOR_EXTERNAL:
+                _state_store = StateClient(config.STATE_SOCKET_PATH)
+            else:
+                _state_store = StateStore(
+                    config.STATE_FILE,
+                    flush_interval=config.STATE_FLUSH_INTERVAL,
+                    screen_file=config.SCREEN_OPERATION_FILE
+                )
+                _state_store.start()
+                
+    return _state_store
+
+def get_cameras():
+    """
+    Get the shared camera streams for all configured sources, starting them on first use.
+    
+    Returns:
+        dict: Source name to running CameraStream, in configuration order
+    """
+    global _cameras
+    
+    with _camera_lock:
+        if _cameras is None:
+            _cameras = {}
+            for spec in config.CAMERA_SOURCES:
+                camera = CameraStream(parse_source(spec), config.CAMERA_BUFFER_SIZE)
+                camera.start()
+                _cameras[camera.name] = camera
+                
+    return _cameras
+
+def get_camera():
+    """
+    Get the primary (first configured) camera stream.
+    
+    Returns:
+        CameraStream: The running camera stream
+    """
+    return next(iter(get_cameras().values()))
+
+def capture_image(camera=None):
+    """
+    Get the freshest frame from a shared camera stream.
+    
+    Args:
+        camera (CameraStream): Stream to read from; defaults to the primary camera
     
     Returns:
         numpy.ndarray: The captured image frame, or None if capture failed
     """
     try:
-        cap = cv2.VideoCapture(0)
-        
-        # Check if camera opened successfully
-        if not cap.isOpened():
-            logger.error("Error: Could not open webcam")
-            return None
-        
-        # Wait for camera to initialize
-        cv2.waitKey(1000)
-        
-        # Capture frame
-        ret, frame = cap.read()
+        camera = camera or get_camera()
         
-        # Release the camera
-        cap.release()
+        # Only the very first call has to wait for the device to deliver a frame
+        latest = camera.latest(max_age=config.CAMERA_MAX_FRAME_AGE)
+        if latest is None:
+            latest = camera.wait_for_frame(config.CAMERA_FRAME_TIMEOUT, config.CAMERA_MAX_FRAME_AGE)
         
-        if not ret:
-            logger.error("Failed to capture image from webcam")
+        if latest is None:
+            logger.error(f"Failed to capture image from camera {camera.name}")
             return None
             
-        logger.info("Image captured successfully")
+        timestamp, frame = latest
+        logger.debug(f"Using buffered frame captured at {timestamp:.3f}")
         return frame
         
     except Exception as e:
         logger.error(f"Error capturing image: {str(e)}")
         return None
 
-def analyze_emotion(img_path):
+def get_engine():
     """
-    Analyze the emotion in an image using DeepFace.
+    Get the shared emotion inference engine, loading the model on first use.
     
-    Args:
-        img_path (str): Path to the image file
-        
     Returns:
-        str: The dominant emotion detected
+        EmotionEngine: The running inference engine
     """
-    try:
-        # Analyze only the emotion
-        face_analysis_list = DeepFace.analyze(img_path=img_path, actions=['emotion'])
-        
-        # If no faces detected or empty result
-        if not face_analysis_list:
-            logger.warning("No faces detected in the image")
-            return "neutral"
+    global _engine
+    
+    with _engine_lock:
+        if _engine is None:
+            _engine = EmotionEngine(
+                use_process_pool=config.EMOTION_USE_PROCESS_POOL,
+                detector_backend=config.EMOTION_DETECTOR_BACKEND
+            )
+            _engine.start()
             
-        # Select the first face analysis
-        face_analysis = face_analysis_list[0]
-        
-        # Extract the dominant emotion and probabilities
-        dominant_emotion = face_analysis['dominant_emotion']
-        emotion_probabilities = face_analysis['emotion']
+    return _engine
+
+def get_batcher():
+    """
+    Get the shared batch collector that groups face crops from all cameras.
+    
+    Returns:
+        BatchCollector: The running batch collector
+    """
+    global _batcher
+    
+    engine = get_engine()
+    
+    with _engine_lock:
+        if _batcher is None:
+            _batcher = BatchCollector(engine, config.EMOTION_BATCH_WINDOW, config.EMOTION_MAX_BATCH_SIZE)
+            
+    return _batcher
+
+def get_recorder():
+    """
+    Get the debug frame recorder if saving captured images is enabled.
+    
+    Returns:
+        FrameRecorder: The recorder, or None when disabled
+    """
+    global _recorder
+    
+    if not config.SAVE_CAPTURED_IMAGES:
+        return None
         
-        logger.info(f"Emotion analysis complete: {dominant_emotion} ({emotion_probabilities[dominant_emotion]:.2f}%)")
-        logger.debug(f"All emotion probabilities: {emotion_probabilities}")
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = FrameRecorder(config.CAPTURED_IMAGE_FILE)
+            
+    return _recorder
+
+def get_face_gate(source):
+    """
+    Get the face-presence gate for a source if gating is enabled.
+    
+    Args:
+        source (str): Camera source name; each source keeps its own motion history
+    
+    Returns:
+        FaceGate: The gate, or None when disabled or unavailable
+    """
+    global _face_gate_failed
+    
+    if not config.EMOTION_FACE_GATE or _face_gate_failed:
+        return None
         
-        # Apply threshold for the "sad" emotion
-        if dominant_emotion == 'sad' and emotion_probabilities['sad'] < SAD_THRESHOLD:
-            logger.info(f"Sad emotion below threshold ({emotion_probabilities['sad']} < {SAD_THRESHOLD}), changing to neutral")
-            return 'neutral'
+    with _face_gate_lock:
+        if source not in _face_gates and not _face_gate_failed:
+            try:
+                _face_gates[source] = FaceGate(
+                    scale_width=config.FACE_GATE_WIDTH,
+                    motion_threshold=config.FACE_GATE_MOTION_THRESHOLD,
+                    roi_size=config.FACE_ROI_SIZE
+                )
+            except Exception as e:
+                logger.error(f"Face gate unavailable, analyzing full frames: {str(e)}")
+                _face_gate_failed = True
+                
+        return _face_gates.get(source)
+
+def _get_smoother(source):
+    """Get the emotion smoother for a source."""
+    with _smoother_lock:
+        if source not in _smoothers:
+            _smoothers[source] = EmotionSmoother(
+                alpha=config.EMOTION_SMOOTHING_ALPHA,
+                sad_enter=config.SAD_THRESHOLD,
+                sad_exit=config.SAD_EXIT_THRESHOLD,
+                reset_after=config.EMOTION_SMOOTHING_RESET_AFTER
+            )
             
-        return dominant_emotion
+        return _smoothers[source]
+
+def get_pipeline_stats():
+    """
+    Get per-stage timings, gating and batching statistics for the detection pipeline.
+    
+    Returns:
+        dict: Average time and latency histogram per stage, plus per-source camera and face gate counters
+    """
+    stages = {stage: histogram.snapshot() for stage, histogram in _stage_timings.items()}
+    stats = {f"avg_{stage}_time": snapshot["avg"] for stage, snapshot in stages.items()}
+    stats["stages"] = stages
+    
+    stats["sources"] = {}
+    for name, camera in get_cameras().items():
+        face_gate = _face_gates.get(name)
+        stats["sources"][name] = {
+            "camera": camera.stats(),
+            "face_gate": face_gate.stats() if face_gate is not None else None
+        }
         
-    except Exception as e:
-        logger.error(f"Error analyzing emotion: {str(e)}")
-        return "error"
+    if _batcher is not None:
+        stats["batching"] = _batcher.stats()
+        
+    return stats
+
+def warm_up():
+    """
+    Start the cameras and load the emotion model in the background.
+    
+    Returns:
+        Future: Completes when the model is loaded and warmed up
+    """
+    get_cameras()
+    return get_engine().start()
 
 def is_screen_on():
     """
@@ -106,64 +276,256 @@ def is_screen_on():
         bool: True if screen is on, False otherwise
     """
     try:
-        # Ensure the file exists
-        Path(SCREEN_OPERATION_FILE).touch(exist_ok=True)
-        
-        with open(SCREEN_OPERATION_FILE, "r") as f:
-            screen_operation = f.read().strip().lower()
-            
-        return screen_operation == "on"
+        return get_state_store().get().screen_on
         
     except Exception as e:
         logger.error(f"Error checking screen operation: {str(e)}")
         return False
 
-def save_emotion(emotion):
+def save_emotion(emotion, probabilities=None, confidence=None, sources=None):
     """
-    Save the detected emotion to the emotion file.
+    Save the detected emotion to the shared state.
     
     Args:
         emotion (str): The emotion to save
+        probabilities (dict): Smoothed emotion probabilities, if available
+        confidence (float): Confidence of the reported emotion, if available
+        sources (dict): Per-camera results when several cameras are configured
     """
     try:
-        with open(EMOTION_FILE, "w") as f:
-            f.write(emotion)
+        get_state_store().update(
+            emotion=emotion,
+            probabilities=probabilities or {},
+            confidence=confidence,
+            sources=sources or {},
+            emotion_updated_at=time.time()
+        )
         logger.info(f"Emotion saved: {emotion}")
     except Exception as e:
         logger.error(f"Error saving emotion: {str(e)}")
 
-def capture_and_predict_emotion():
+def _is_no_face_error(error):
+    """Check whether a DeepFace exception means no face was found in the frame."""
+    return isinstance(error, ValueError) and "Face could not be detected" in str(error)
+
+def _resolved(result):
+    """Wrap a result in an already-completed future."""
+    future = Future()
+    future.set_result(result)
+    return future
+
+def _completed(emotion):
+    """Save an emotion and wrap it in an already-completed future."""
+    save_emotion(emotion)
+    return _resolved({"emotion": emotion, "face_detected": False})
+
+def _finish_source(source, analysis_future, result_future, submitted_at, full_frame):
+    """Fold one source's finished analysis into its smoothed estimate and resolve its future."""
+    _record_stage("inference", time.perf_counter() - submitted_at)
+    result = {"emotion": "neutral", "face_detected": False}
+    
+    try:
+        probabilities = analysis_future.result()
+        
+        # Full-frame DeepFace analysis returns a list of faces; batched crops return probabilities directly
+        if full_frame:
+            probabilities = probabilities[0]['emotion'] if probabilities else None
+        
+        if probabilities:
+            result = _get_smoother(source).update(probabilities)
+            result["face_detected"] = True
+            logger.info(f"Emotion analysis complete for {source}: {result['emotion']} (confidence {result['confidence']:.2f})")
+        else:
+            logger.warning(f"No faces detected in the image from {source}")
+    except Exception as e:
+        if _is_no_face_error(e):
+            logger.info(f"No face in front of camera {source}")
+        else:
+            logger.error(f"Error analyzing emotion for {source}: {str(e)}")
+            result = {"emotion": "error", "face_detected": False}
+        
+    result_future.set_result(result)
+
+def _detect_source_async(source, camera, record=False):
+    """Capture one camera's frame and submit it for analysis; resolves to that source's result."""
+    try:
+        # Capture image
+        started = time.perf_counter()
+        captured_image = capture_image(camera)
+        _record_stage("capture", time.perf_counter() - started)
+        
+        if captured_image is None:
+            return _resolved({"emotion": "error", "face_detected": False})
+            
+        # Optionally keep a copy on disk for debugging, off the hot path
+        recorder = get_recorder() if record else None
+        if recorder is not None:
+            recorder.record(captured_image)
+        
+        result_future = Future()
+        face_gate = get_face_gate(source)
+        
+        if face_gate is None:
+            # Hand the frame itself to the inference worker, no encode/decode round trip
+            submitted_at = time.perf_counter()
+            analysis_future = get_engine().submit(captured_image)
+            analysis_future.add_done_callback(
+                lambda f: _finish_source(source, f, result_future, submitted_at, full_frame=True))
+            return result_future
+        
+        # Skip inference entirely when nobody is there; otherwise only analyze the face
+        started = time.perf_counter()
+        face_roi = face_gate.process(captured_image)
+        _record_stage("gate", time.perf_counter() - started)
+        
+        if face_roi is None:
+            logger.debug(f"No face or motion in frame from {source}, skipping emotion analysis")
+            return _resolved({"emotion": "neutral", "face_detected": False})
+            
+        # Crops from all cameras arriving together share one batched model call
+        submitted_at = time.perf_counter()
+        analysis_future = get_batcher().submit(face_roi)
+        analysis_future.add_done_callback(
+            lambda f: _finish_source(source, f, result_future, submitted_at, full_frame=False))
+        return result_future
+        
+    except Exception as e:
+        logger.error(f"Unexpected error in emotion detection for {source}: {str(e)}")
+        return _resolved({"emotion": "error", "face_detected": False})
+
+def _publish(source_futures, result_future):
+    """Save the combined result of all sources and resolve the caller's future."""
+    results = {source: future.result() for source, future in source_futures.items()}
+    
+    # The mirror-level emotion follows the first camera that currently sees a face
+    primary = next((r for r in results.values() if r.get("face_detected")), next(iter(results.values())))
+    multiple = len(results) > 1
+    
+    save_emotion(primary["emotion"], primary.get("probabilities"), primary.get("confidence"),
+                 sources=results if multiple else None)
+    
+    result = dict(primary, face_detected=any(r.get("face_detected") for r in results.values()))
+    if multiple:
+        result["sources"] = results
+    result_future.set_result(result)
+
+def detect_emotion_async():
     """
-    Capture an image from the webcam and predict the emotion.
+    Capture a frame from every camera and submit them for emotion analysis without blocking.
+    
+    Returns:
+        Future: Resolves to a dict with "emotion" and "face_detected" (and
+        per-camera "sources" when several cameras are configured) once saved
     """
     try:
         # Check if screen is on
         if not is_screen_on():
             logger.info("Screen operation is off, skipping emotion detection")
-            save_emotion("Screen operation is off")
-            return
-            
-        # Capture image
-        captured_image = capture_image()
+            return _completed(SCREEN_OFF_EMOTION)
         
-        if captured_image is None:
-            logger.error("Failed to capture image")
-            save_emotion("error")
-            return
-            
-        # Save the captured image
-        cv2.imwrite(CAPTURED_IMAGE_FILE, captured_image)
-        logger.info(f"Image saved to {CAPTURED_IMAGE_FILE}")
+        cameras = get_cameras()
+        source_futures = {
+            source: _detect_source_async(source, camera, record=(index == 0))
+            for index, (source, camera) in enumerate(cameras.items())
+        }
         
-        # Analyze emotion
-        dominant_emotion = analyze_emotion(CAPTURED_IMAGE_FILE)
+        result_future = Future()
+        remaining = [len(source_futures)]
+        remaining_lock = threading.Lock()
         
-        # Save the detected emotion
-        save_emotion(dominant_emotion)
+        def on_source_done(_):
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            _publish(source_futures, result_future)
+            
+        for future in source_futures.values():
+            future.add_done_callback(on_source_done)
+            
+        return result_future
         
     except Exception as e:
         logger.error(f"Unexpected error in emotion detection: {str(e)}")
-        save_emotion("error")
+        return _completed("error")
+
+def run_detection():
+    """
+    Run one capture+inference cycle and wait for its result.
+    
+    Returns:
+        dict: "emotion" label and whether a face was detected
+    """
+    future = detect_emotion_async()
+    
+    try:
+        return future.result(timeout=config.EMOTION_INFERENCE_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Unexpected error in emotion detection: {str(e)}")
+        return {"emotion": "error", "face_detected": False}
+
+def capture_and_predict_emotion():
+    """
+    Capture an image from the webcam and predict the emotion.
+    
+    Returns:
+        str: The detected emotion, or "error" if detection failed
+    """
+    return run_detection()["emotion"]
+
+def _on_state_change(changed, state):
+    """Run a detection cycle right away when the screen is switched on or off."""
+    if "screen_on" in changed and _scheduler is not None:
+        _scheduler.wake()
+
+def get_scheduler():
+    """
+    Get the shared emotion scheduler, starting it on first use.
+    
+    Returns:
+        EmotionScheduler: The running scheduler
+    """
+    global _scheduler
+    
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = EmotionScheduler(
+                run_detection,
+                config.EMOTION_DETECTION_INTERVAL,
+                is_active_fn=is_screen_on,
+                idle_after=config.EMOTION_IDLE_BACKOFF_AFTER,
+                max_interval=config.EMOTION_MAX_DETECTION_INTERVAL
+            )
+            _scheduler.start()
+            # Detection backs off while the screen is off; pick up again as soon as it changes
+            get_state_store().subscribe(_on_state_change)
+            
+    return _scheduler
+
+def serve_forever():
+    """
+    Run detection as a standalone process and share its state over a Unix socket.
+    
+    Web workers started with EMOTION_DETECTOR_EXTERNAL=true read the state
+    from STATE_SOCKET_PATH instead of running their own camera and model.
+    """
+    configure_from_config('emotion_detection.log')
+    store = get_state_store()
+    store.serve(config.STATE_SOCKET_PATH)
+    warm_up()
+    get_scheduler()
+    
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        store.stop()
 
 if __name__ == "__main__":
-    capture_and_predict_emotion()
\ No newline at end of file
+    import sys
+    
+    if "--serve" in sys.argv:
+        serve_forever()
+    else:
+        configure_from_config('emotion_detection.log')
+        print(capture_and_predict_emotion())
\ No newline at end of file
@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import CancelledError, Future
+
+import pytest
+
+pytest.importorskip("deepface")
+
+from utils.emotion_engine import BatchCollector
+
+class FakeEngine:
+    """Records the batches it is given; each is resolved by the test or by `respond`."""
+
+    def __init__(self, respond=None):
+        self.respond = respond
+        self.batches = []
+        self.futures = []
+        self.submitted = threading.Event()
+
+    def submit_batch(self, faces):
+        future = Future()
+        self.batches.append(list(faces))
+        self.futures.append(future)
+        if self.respond is not None:
+            self.respond(faces, future)
+        self.submitted.set()
+        return future
+
+def echo(faces, future):
+    """Answer each face with a probability dictionary naming it."""
+    future.set_result([{"face": face} for face in faces])
+
+def test_crops_within_the_window_share_one_batch():
+    engine = FakeEngine(echo)
+    collector = BatchCollector(engine, window=0.2, max_batch_size=8)
+
+    futures = [collector.submit(name) for name in ("a", "b", "c")]
+
+    assert [future.result(timeout=2) for future in futures] == [{"face": "a"}, {"face": "b"}, {"face": "c"}]
+    assert engine.batches == [["a", "b", "c"]]
+    assert collector.stats() == {"batches": 1, "faces": 3, "avg_batch_size": 3.0}
+
+def test_full_batch_is_dispatched_without_waiting_for_the_window():
+    engine = FakeEngine(echo)
+    collector = BatchCollector(engine, window=30, max_batch_size=2)
+
+    futures = [collector.submit(name) for name in ("a", "b")]
+
+    assert [future.result(timeout=2) for future in futures] == [{"face": "a"}, {"face": "b"}]
+    assert engine.batches == [["a", "b"]]
+
+def test_crops_beyond_max_batch_size_go_into_the_next_batch():
+    engine = FakeEngine(echo)
+    collector = BatchCollector(engine, window=0.2, max_batch_size=2)
+
+    futures = [collector.submit(name) for name in ("a", "b", "c")]
+
+    assert [future.result(timeout=2) for future in futures] == [{"face": "a"}, {"face": "b"}, {"face": "c"}]
+    assert engine.batches == [["a", "b"], ["c"]]
+
+def test_batch_failure_is_raised_to_every_caller():
+    def fail(faces, future):
+        future.set_exception(ValueError("model failed"))
+
+    collector = BatchCollector(FakeEngine(fail), window=0.2)
+    futures = [collector.submit(name) for name in ("a", "b")]
+
+    for future in futures:
+        with pytest.raises(ValueError, match="model failed"):
+            future.result(timeout=2)
+
+def test_callers_without_a_result_fail_instead_of_waiting():
+    def short(faces, future):
+        future.set_result([{"face": faces[0]}])
+
+    collector = BatchCollector(FakeEngine(short), window=0.2)
+    first, second = collector.submit("a"), collector.submit("b")
+
+    assert first.result(timeout=2) == {"face": "a"}
+    with pytest.raises(RuntimeError):
+        second.result(timeout=2)
+
+def test_results_are_distributed_when_the_batch_completes_later():
+    engine = FakeEngine()
+    collector = BatchCollector(engine, window=0, max_batch_size=1)
+
+    future = collector.submit("a")
+    assert engine.submitted.wait(2)
+    assert not future.done()
+
+    engine.futures[0].set_result([{"face": "a"}])
+    assert future.result(timeout=2) == {"face": "a"}
+
+def test_cancelled_batch_cancels_every_caller():
+    engine = FakeEngine()
+    collector = BatchCollector(engine, window=0.2)
+    futures = [collector.submit(name) for name in ("a", "b")]
+    assert engine.submitted.wait(2)
+
+    # What EmotionEngine.shutdown(cancel_futures=True) does to a queued batch
+    engine.futures[0].cancel()
+
+    for future in futures:
+        with pytest.raises(CancelledError):
+            future.result(timeout=2)
@@ -0,0 +1,53 @@
+import time
+
+from utils.emotion_scheduler import EmotionScheduler, SCREEN_OFF_EMOTION
+
+def scheduler(screen):
+    return EmotionScheduler(lambda: {"emotion": "happy", "face_detected": False}, 2,
+                            is_active_fn=lambda: screen[0], max_interval=300)
+
+def test_backs_off_while_the_screen_is_off():
+    screen = [False]
+    emotion_scheduler = scheduler(screen)
+
+    for _ in range(10):
+        emotion_scheduler._run_cycle()
+
+    assert emotion_scheduler.stats()["current_interval"] == 300
+    assert emotion_scheduler.latest()["emotion"] == SCREEN_OFF_EMOTION
+
+def test_interval_resets_when_the_screen_comes_back_on():
+    screen = [False]
+    emotion_scheduler = scheduler(screen)
+    for _ in range(10):
+        emotion_scheduler._run_cycle()
+
+    screen[0] = True
+    emotion_scheduler._run_cycle()
+
+    assert emotion_scheduler.stats()["current_interval"] == 2
+    assert emotion_scheduler.latest()["emotion"] == "happy"
+
+def test_wake_runs_a_cycle_without_waiting_for_the_interval():
+    screen = [False]
+    emotion_scheduler = scheduler(screen)
+    for _ in range(10):
+        emotion_scheduler._run_cycle()
+
+    emotion_scheduler.start()
+    try:
+        # The first cycle runs at start, then the loop sleeps for the backed-off 300s
+        deadline = time.monotonic() + 2
+        while emotion_scheduler.stats()["cycles_completed"] < 11 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        screen[0] = True
+        emotion_scheduler.wake()
+
+        while emotion_scheduler.latest()["emotion"] != "happy" and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert emotion_scheduler.latest()["emotion"] == "happy"
+        assert emotion_scheduler.stats()["current_interval"] == 2
+    finally:
+        emotion_scheduler.stop()
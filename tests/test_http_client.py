@@ -0,0 +1,176 @@
+import pytest
+import requests
+
+from utils import http_client
+from utils.http_client import CircuitBreaker, CircuitOpenError, HttpClient
+
+class Clock:
+    """Stands in for time.monotonic so cooldowns pass instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_client.time, "monotonic", clock)
+    monkeypatch.setattr(http_client.time, "sleep", lambda seconds: None)
+    return clock
+
+def response(status):
+    result = requests.Response()
+    result.status_code = status
+    return result
+
+def client_returning(monkeypatch, *outcomes, **kwargs):
+    """HttpClient whose session answers with the given responses or raises the given exceptions, in order."""
+    client = HttpClient(**kwargs)
+    outcomes = list(outcomes)
+    calls = []
+
+    def get(url, params=None, timeout=None):
+        calls.append(url)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(client.session, "get", get)
+    client.calls = calls
+    return client
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_breaker_allows_one_trial_after_cooldown(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 29
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only the one trial goes through until it reports back
+    assert not breaker.allow()
+
+def test_half_open_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+def test_half_open_failure_reopens_for_another_cooldown(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+
+def test_client_retries_5xx_then_succeeds(clock, monkeypatch):
+    client = client_returning(monkeypatch, response(503), response(502), response(200), max_retries=2)
+
+    result = client.get("http://upstream/a", "upstream")
+
+    assert result.status_code == 200
+    stats = client.stats()["upstream"]
+    assert (stats["requests"], stats["retries"], stats["errors"], stats["circuit"]) == (3, 2, 2, "closed")
+
+def test_client_returns_last_5xx_once_retries_are_exhausted(clock, monkeypatch):
+    client = client_returning(monkeypatch, response(500), response(500), max_retries=1, failure_threshold=1)
+
+    assert client.get("http://upstream/a", "upstream").status_code == 500
+    assert client.stats()["upstream"]["circuit"] == "open"
+
+def test_client_does_not_retry_4xx(clock, monkeypatch):
+    client = client_returning(monkeypatch, response(404), max_retries=2, failure_threshold=1)
+
+    assert client.get("http://upstream/a", "upstream").status_code == 404
+    assert len(client.calls) == 1
+    assert client.stats()["upstream"]["circuit"] == "closed"
+
+def test_client_rejects_calls_while_open(clock, monkeypatch):
+    client = client_returning(monkeypatch, requests.exceptions.ConnectionError("down"),
+                              max_retries=0, failure_threshold=1)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get("http://upstream/a", "upstream")
+    with pytest.raises(CircuitOpenError):
+        client.get("http://upstream/a", "upstream")
+
+    assert len(client.calls) == 1
+    assert client.stats()["upstream"]["rejected"] == 1
+
+def test_client_half_open_trial_closes_on_success(clock, monkeypatch):
+    client = client_returning(monkeypatch, requests.exceptions.Timeout("slow"), response(200),
+                              max_retries=0, failure_threshold=1, reset_timeout=30)
+
+    with pytest.raises(requests.exceptions.Timeout):
+        client.get("http://upstream/a", "upstream")
+    clock.now += 30
+
+    assert client.get("http://upstream/a", "upstream").status_code == 200
+    assert client.stats()["upstream"]["circuit"] == "closed"
+
+def test_non_retryable_error_on_half_open_trial_reopens(clock, monkeypatch):
+    client = client_returning(monkeypatch, requests.exceptions.ConnectionError("down"),
+                              requests.exceptions.TooManyRedirects("loop"), response(200),
+                              max_retries=0, failure_threshold=1, reset_timeout=30)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get("http://upstream/a", "upstream")
+    clock.now += 30
+
+    # The trial must still report back, or the circuit would stay half-open for good
+    with pytest.raises(requests.exceptions.TooManyRedirects):
+        client.get("http://upstream/a", "upstream")
+    assert client.stats()["upstream"]["circuit"] == "open"
+
+    clock.now += 30
+    assert client.get("http://upstream/a", "upstream").status_code == 200
+    assert client.stats()["upstream"]["circuit"] == "closed"
+
+def test_endpoints_have_separate_breakers(clock, monkeypatch):
+    client = client_returning(monkeypatch, requests.exceptions.ConnectionError("down"), response(200),
+                              max_retries=0, failure_threshold=1)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get("http://geocoder/a", "geocoder")
+
+    assert client.get("http://weather/a", "weather").status_code == 200
+    assert client.stats()["geocoder"]["circuit"] == "open"
+    assert client.stats()["weather"]["circuit"] == "closed"
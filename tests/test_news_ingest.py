@@ -0,0 +1,71 @@
+import io
+
+from utils.news import NewsEntry
+from utils.news_ingest import FeedIngestor, clean_text, content_hash, format_entry
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+{items}
+</channel></rss>
+"""
+
+ITEM = """<item>
+  <title>{title}</title>
+  <description>{description}</description>
+  <pubDate>Mon, 08 May 2023 16:00:54 +0000</pubDate>
+</item>"""
+
+def feed(*entries):
+    """Build an RSS document from (title, description) pairs."""
+    items = "\n".join(ITEM.format(title=title, description=description) for title, description in entries)
+    return io.BytesIO(RSS.format(items=items).encode("utf-8"))
+
+def read_titles(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line[len("Title: "):].strip() for line in f if line.startswith("Title: ")]
+
+def test_clean_text_strips_tags_and_collapses_whitespace():
+    assert clean_text("<p>Puppies <b>rescued</b>\n\n  from   flood</p>") == "Puppies rescued from flood"
+
+def test_clean_text_decodes_double_encoded_entities():
+    assert clean_text("It&amp;#8217;s a &amp;quot;good&amp;quot; day") == "It’s a \"good\" day"
+
+def test_clean_text_removes_the_post_appeared_first_trailer():
+    text = "A park reopened. The post Park reopens appeared first on Good News Daily."
+    assert clean_text(text) == "A park reopened."
+
+def test_clean_text_handles_missing_text():
+    assert clean_text(None) == ""
+    assert clean_text("") == ""
+
+def test_content_hash_ignores_markup_case_and_spacing():
+    assert content_hash("Good  News", "<p>Kind people</p>") == content_hash("good news", "KIND PEOPLE")
+    assert content_hash("Good News", "Kind people") != content_hash("Good News", "Kind dogs")
+
+def test_ingest_appends_new_entries(tmp_path):
+    news_file = tmp_path / "news.txt"
+    result = FeedIngestor(str(news_file)).ingest(feed(("First", "One"), ("Second", "Two")))
+
+    assert result == {"seen": 2, "added": 2, "duplicates": 0}
+    assert read_titles(news_file) == ["First", "Second"]
+
+def test_ingest_skips_entries_already_in_the_file(tmp_path):
+    news_file = tmp_path / "news.txt"
+    news_file.write_text(format_entry(NewsEntry("Old story", "Already here", "Mon, 01 May 2023 10:00:00 +0000")),
+                         encoding="utf-8")
+
+    result = FeedIngestor(str(news_file)).ingest(feed(("OLD   story", "<b>already</b> here"), ("New story", "Fresh")))
+
+    assert result == {"seen": 2, "added": 1, "duplicates": 1}
+    assert read_titles(news_file) == ["Old story", "New story"]
+
+def test_ingest_dedupes_within_a_feed_and_across_runs(tmp_path):
+    news_file = tmp_path / "news.txt"
+    ingestor = FeedIngestor(str(news_file), batch_size=1)
+
+    first = ingestor.ingest(feed(("Same", "Story"), ("Same", "Story"), ("Other", "Story")))
+    second = FeedIngestor(str(news_file)).ingest(feed(("Same", "Story"), ("Other", "Story")))
+
+    assert first == {"seen": 3, "added": 2, "duplicates": 1}
+    assert second == {"seen": 2, "added": 0, "duplicates": 2}
+    assert read_titles(news_file) == ["Same", "Other"]
@@ -1,7 +1,7 @@
 # This file makes the utils directory a Python package
 # It allows importing modules from the utils directory
 
-from utils.weather import WeatherService
+from utils.weather import WeatherService, AsyncWeatherService
 from utils.news import NewsService
 
-__all__ = ['WeatherService', 'NewsService']
\ No newline at end of file
+__all__ = ['WeatherService', 'AsyncWeatherService', 'NewsService']
\ No newline at end of file
@@ -0,0 +1,423 @@
+import os
+import cv2
+import time
+import logging
+import threading
+import numpy as np
+from collections import deque
+from typing import Dict, Any, Optional, Tuple, Union
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+class SyntheticSource:
+    """Frame source that generates moving test frames, for use in place of a real camera."""
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 15.0, name: str = "synthetic"):
+        """
+        Initialize the synthetic source.
+
+        Args:
+            width: Frame width in pixels
+            height: Frame height in pixels
+            fps: Rate frames are produced at; read() sleeps to honour it
+            name: Identifier used for this source in logs and results
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.name = name
+        self._frame_index = 0
+        self._next_frame_at = time.monotonic()
+
+    def isOpened(self) -> bool:
+        """Mirror cv2.VideoCapture.isOpened(); always True."""
+        return True
+
+    def read(self) -> Tuple[bool, Any]:
+        """
+        Produce the next frame, mirroring cv2.VideoCapture.read().
+
+        Returns:
+            Tuple of (True, BGR numpy array)
+        """
+        delay = self._next_frame_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_frame_at = max(self._next_frame_at, time.monotonic()) + 1.0 / self.fps
+
+        # A bright square sweeping across a dark background gives the motion detector something to see
+        frame = np.full((self.height, self.width, 3), 32, dtype=np.uint8)
+        size = self.height // 4
+        x = (self._frame_index * 8) % max(1, self.width - size)
+        frame[size:2 * size, x:x + size] = 200
+        self._frame_index += 1
+        return True, frame
+
+    def release(self):
+        """Mirror cv2.VideoCapture.release(); nothing to free."""
+        pass
+
+class FrameDirectorySource:
+    """Frame source that replays a directory of recorded images in name order, looping at the end."""
+
+    IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+    def __init__(self, directory: str, fps: float = 15.0, loop: bool = True):
+        """
+        Initialize the frame directory source.
+
+        Args:
+            directory: Directory containing the recorded frames
+            fps: Rate frames are replayed at; read() sleeps to honour it
+            loop: Start again from the first frame after the last one
+        """
+        self.directory = directory
+        self.fps = fps
+        self.loop = loop
+        self.name = os.path.basename(os.path.normpath(directory))
+        self.paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(self.IMAGE_EXTENSIONS)
+        )
+        self._frame_index = 0
+        self._next_frame_at = time.monotonic()
+
+    def isOpened(self) -> bool:
+        """Mirror cv2.VideoCapture.isOpened(); True if there are frames to replay."""
+        return bool(self.paths)
+
+    def read(self) -> Tuple[bool, Any]:
+        """
+        Read the next recorded frame, mirroring cv2.VideoCapture.read().
+
+        Returns:
+            Tuple of (success, BGR numpy array or None)
+        """
+        if self._frame_index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self._frame_index = 0
+
+        delay = self._next_frame_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_frame_at = max(self._next_frame_at, time.monotonic()) + 1.0 / self.fps
+
+        frame = cv2.imread(self.paths[self._frame_index])
+        self._frame_index += 1
+        return frame is not None, frame
+
+    def release(self):
+        """Mirror cv2.VideoCapture.release(); nothing to free."""
+        pass
+
+def parse_source(spec: str) -> Union[int, str, SyntheticSource, FrameDirectorySource]:
+    """
+    Turn a configured source string into something CameraStream can open.
+
+    Args:
+        spec: Device index ("0"), "synthetic", a directory of recorded frames, or a video file path/URL
+
+    Returns:
+        Device index, SyntheticSource, FrameDirectorySource, or the path unchanged
+    """
+    spec = spec.strip()
+
+    if spec.isdigit():
+        return int(spec)
+    if spec == "synthetic":
+        return SyntheticSource()
+    if os.path.isdir(spec):
+        return FrameDirectorySource(spec)
+    return spec
+
+class CameraStream:
+    """Long-lived camera capture that keeps the latest frames in a ring buffer."""
+
+    def __init__(self, source: Union[int, str, Any] = 0, buffer_size: int = 5, reconnect_delay: float = 2.0):
+        """
+        Initialize the camera stream.
+
+        Args:
+            source: OpenCV capture source (device index or video file/URL), or an
+                    object with the cv2.VideoCapture read/isOpened/release interface
+            buffer_size: Number of most recent frames kept in the ring buffer
+            reconnect_delay: Seconds to wait before reopening a failed device
+        """
+        self.source = source
+        self.name = str(source) if isinstance(source, (int, str)) else getattr(source, "name", repr(source))
+        self.buffer_size = max(1, buffer_size)
+        self.reconnect_delay = reconnect_delay
+
+        self._frames = deque(maxlen=self.buffer_size)
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._capture = None
+
+        # Counters used to size the buffer and monitor the device
+        self._frames_captured = 0
+        self._frames_dropped = 0
+        self._read_failures = 0
+        self._frames_consumed = 0
+        self._last_consumed_seq = 0
+        self._fps = 0.0
+        self._started_at = None
+
+    def start(self) -> bool:
+        """
+        Start the background capture thread.
+
+        Returns:
+            True if the thread is running, False otherwise
+        """
+        if self._running:
+            return True
+
+        self._running = True
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._capture_loop, name=f"camera-{self.name}", daemon=True)
+        self._thread.start()
+        logger.info(f"Camera capture started on source {self.name} (buffer size {self.buffer_size})")
+        return True
+
+    def stop(self, timeout: float = 2.0):
+        """
+        Stop the capture thread and release the device.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+        self._release()
+        logger.info("Camera capture stopped")
+
+    @property
+    def running(self) -> bool:
+        """Whether the capture thread is active."""
+        return self._running
+
+    def _open(self) -> bool:
+        """Open the capture device, returning True on success."""
+        try:
+            if isinstance(self.source, (int, str)):
+                self._capture = cv2.VideoCapture(self.source)
+            else:
+                self._capture = self.source
+
+            if not self._capture.isOpened():
+                logger.error(f"Error: Could not open camera source {self.name}")
+                self._release()
+                return False
+
+            logger.info(f"Camera source {self.name} opened")
+            return True
+        except Exception as e:
+            logger.error(f"Error opening camera source {self.name}: {str(e)}")
+            self._release()
+            return False
+
+    def _release(self):
+        """Release the capture device if it is open."""
+        if self._capture is not None:
+            try:
+                self._capture.release()
+            except Exception as e:
+                logger.warning(f"Error releasing camera: {str(e)}")
+            self._capture = None
+
+    def _capture_loop(self):
+        """Read frames continuously into the ring buffer."""
+        window_start = time.monotonic()
+        window_frames = 0
+
+        while self._running:
+            if self._capture is None and not self._open():
+                time.sleep(self.reconnect_delay)
+                continue
+
+            try:
+                ret, frame = self._capture.read()
+            except Exception as e:
+                logger.error(f"Error reading from camera: {str(e)}")
+                ret, frame = False, None
+
+            if not ret or frame is None:
+                self._read_failures += 1
+                logger.warning("Failed to read frame from camera, reopening device")
+                self._release()
+                time.sleep(self.reconnect_delay)
+                continue
+
+            now = time.time()
+
+            with self._condition:
+                # A full buffer evicts its oldest frame; count it as dropped
+                # if no consumer ever saw it.
+                if len(self._frames) == self.buffer_size:
+                    oldest_seq = self._frames[0][0]
+                    if oldest_seq > self._last_consumed_seq:
+                        self._frames_dropped += 1
+
+                self._frames_captured += 1
+                self._frames.append((self._frames_captured, now, frame))
+                self._condition.notify_all()
+
+            # Update the FPS estimate once per second
+            window_frames += 1
+            elapsed = time.monotonic() - window_start
+            if elapsed >= 1.0:
+                self._fps = window_frames / elapsed
+                window_start = time.monotonic()
+                window_frames = 0
+
+        self._release()
+
+    def latest(self, max_age: Optional[float] = None) -> Optional[Tuple[float, Any]]:
+        """
+        Get the most recent frame without blocking.
+
+        Args:
+            max_age: Reject the frame if it is older than this many seconds
+
+        Returns:
+            Tuple of (timestamp, frame) or None if no suitable frame is buffered
+        """
+        with self._condition:
+            if not self._frames:
+                return None
+
+            seq, timestamp, frame = self._frames[-1]
+
+            if max_age is not None and time.time() - timestamp > max_age:
+                return None
+
+            if seq > self._last_consumed_seq:
+                self._last_consumed_seq = seq
+                self._frames_consumed += 1
+
+        return timestamp, frame
+
+    def wait_for_frame(self, timeout: float = 2.0, max_age: Optional[float] = None) -> Optional[Tuple[float, Any]]:
+        """
+        Get the most recent frame, waiting until one is available.
+
+        Args:
+            timeout: Maximum seconds to wait for a frame
+            max_age: Wait for a frame no older than this many seconds
+
+        Returns:
+            Tuple of (timestamp, frame) or None if no frame arrived in time
+        """
+        def frame_ready():
+            if not self._running:
+                return True
+            if not self._frames:
+                return False
+            return max_age is None or time.time() - self._frames[-1][1] <= max_age
+
+        with self._condition:
+            self._condition.wait_for(frame_ready, timeout)
+
+        return self.latest(max_age=max_age)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get capture statistics.
+
+        Returns:
+            Dictionary with FPS, frame counters and buffer occupancy
+        """
+        with self._condition:
+            buffered = len(self._frames)
+            newest = self._frames[-1][1] if self._frames else None
+
+        return {
+            "source": self.name,
+            "running": self._running,
+            "fps": round(self._fps, 2),
+            "frames_captured": self._frames_captured,
+            "frames_consumed": self._frames_consumed,
+            "frames_dropped": self._frames_dropped,
+            "read_failures": self._read_failures,
+            "buffer_size": self.buffer_size,
+            "buffered_frames": buffered,
+            "latest_frame_age": round(time.time() - newest, 3) if newest else None,
+            "uptime": round(time.monotonic() - self._started_at, 1) if self._started_at else 0
+        }
+
+class FrameRecorder:
+    """Optional debug sink that writes captured frames to disk on a background thread."""
+
+    def __init__(self, output_path: str, queue_size: int = 2, jpeg_quality: int = 90):
+        """
+        Initialize the frame recorder.
+
+        Args:
+            output_path: JPEG file that is replaced with each recorded frame
+            queue_size: Frames allowed to wait for the writer before new ones are dropped
+            jpeg_quality: OpenCV JPEG quality (0-100)
+        """
+        self.output_path = output_path
+        self.jpeg_quality = jpeg_quality
+
+        self._queue = deque(maxlen=max(1, queue_size))
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._write_loop, name="frame-recorder", daemon=True)
+        self._thread.start()
+
+        self._frames_written = 0
+        self._frames_skipped = 0
+
+    def record(self, frame: Any):
+        """
+        Queue a frame for writing without blocking the caller.
+
+        Args:
+            frame: BGR numpy array; it is not copied and must not be modified afterwards
+        """
+        with self._condition:
+            if len(self._queue) == self._queue.maxlen:
+                self._frames_skipped += 1
+            self._queue.append(frame)
+            self._condition.notify()
+
+    def _write_loop(self):
+        """Encode and write queued frames, replacing the output file atomically."""
+        tmp_path = f"{self.output_path}.tmp.jpg"
+
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue)
+                frame = self._queue.popleft()
+
+            try:
+                if cv2.imwrite(tmp_path, frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]):
+                    os.replace(tmp_path, self.output_path)
+                    self._frames_written += 1
+                    logger.debug(f"Frame written to {self.output_path}")
+                else:
+                    logger.warning(f"Failed to encode frame to {self.output_path}")
+            except Exception as e:
+                logger.error(f"Error writing frame: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get recorder statistics.
+
+        Returns:
+            Dictionary with written and skipped frame counts
+        """
+        return {
+            "output_path": self.output_path,
+            "frames_written": self._frames_written,
+            "frames_skipped": self._frames_skipped
+        }
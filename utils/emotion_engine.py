@@ -0,0 +1,358 @@
+import cv2
+import time
+import logging
+import threading
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, List, Optional
+from deepface import DeepFace
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Per-worker state. In thread mode this lives in the web server process; in
+# process mode each pool worker holds its own copy.
+_detector_backend = "opencv"
+
+def _load_models(detector_backend: str, warm_up: bool):
+    """
+    Load the emotion model and face detector into the current worker.
+
+    DeepFace caches built models at module level, so doing this once per
+    worker means later analyze() calls never pay the load cost.
+
+    Args:
+        detector_backend: DeepFace face detector backend name
+        warm_up: Run a dummy inference to initialise the full graph
+    """
+    global _detector_backend
+    _detector_backend = detector_backend
+
+    DeepFace.build_model("Emotion")
+
+    if warm_up:
+        blank = np.zeros((224, 224, 3), dtype=np.uint8)
+        DeepFace.analyze(img_path=blank, actions=['emotion'], detector_backend=detector_backend,
+                         enforce_detection=False, silent=True)
+
+def _run_analysis(img, detector_backend: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Run emotion analysis in the current worker.
+
+    Args:
+        img: BGR numpy array (or image path)
+        detector_backend: Override the worker's detector, e.g. "skip" for pre-cropped faces
+
+    Returns:
+        List of DeepFace face analysis dictionaries
+    """
+    return DeepFace.analyze(img_path=img, actions=['emotion'], detector_backend=detector_backend or _detector_backend,
+                            silent=True)
+
+# Output order of DeepFace's emotion model
+EMOTION_LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+
+def _predict_batch(faces: List[Any]) -> List[Dict[str, float]]:
+    """
+    Run the emotion model once on a batch of cropped faces.
+
+    Applies the same preprocessing as DeepFace.analyze (48x48 grayscale in
+    [0, 1]) but stacks every face into a single tensor.
+
+    Args:
+        faces: BGR numpy arrays, each already cropped to a single face
+
+    Returns:
+        Emotion name to percentage for each face, in input order
+    """
+    model = DeepFace.build_model("Emotion")
+
+    batch = np.stack([
+        cv2.resize(cv2.cvtColor(face, cv2.COLOR_BGR2GRAY), (48, 48))
+        for face in faces
+    ]).astype(np.float32) / 255.0
+
+    predictions = model.predict(batch[..., np.newaxis], verbose=0)
+
+    results = []
+    for row in predictions:
+        total = float(row.sum()) or 1.0
+        results.append({label: 100 * float(row[i]) / total for i, label in enumerate(EMOTION_LABELS)})
+    return results
+
+class EmotionEngine:
+    """Keeps the DeepFace emotion model loaded and runs inference off the request thread."""
+
+    def __init__(self, use_process_pool: bool = False, detector_backend: str = "opencv", warm_up: bool = True):
+        """
+        Initialize the emotion engine.
+
+        Args:
+            use_process_pool: Run inference in a dedicated worker process instead of a thread
+            detector_backend: DeepFace face detector backend name
+            warm_up: Run a dummy inference at startup so the first request is fast
+        """
+        self.use_process_pool = use_process_pool
+        self.detector_backend = detector_backend
+        self.warm_up = warm_up
+
+        self._executor = None
+        self._ready_future = None
+        self._lock = threading.Lock()
+
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_inference_time = 0.0
+        self._load_time = None
+
+    def start(self) -> Future:
+        """
+        Create the worker and begin loading the models in the background.
+
+        Returns:
+            Future that completes when the models are loaded and warmed up
+        """
+        with self._lock:
+            if self._executor is not None:
+                return self._ready_future
+
+            # A single worker: one model instance, and TensorFlow already
+            # parallelises each inference internally.
+            initargs = (self.detector_backend, False)
+            if self.use_process_pool:
+                self._executor = ProcessPoolExecutor(max_workers=1, initializer=_load_models, initargs=initargs)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="emotion-engine",
+                                                    initializer=_load_models, initargs=initargs)
+
+            mode = "process" if self.use_process_pool else "thread"
+            logger.info(f"Starting emotion engine in {mode} mode")
+
+            started = time.monotonic()
+            self._ready_future = self._executor.submit(_load_models, self.detector_backend, self.warm_up)
+            self._ready_future.add_done_callback(lambda f: self._on_ready(f, started))
+            return self._ready_future
+
+    def _on_ready(self, future: Future, started: float):
+        """Record the outcome of the model load."""
+        self._load_time = time.monotonic() - started
+
+        if future.exception() is not None:
+            logger.error(f"Error loading emotion model: {str(future.exception())}")
+        else:
+            logger.info(f"Emotion model loaded and warmed up in {self._load_time:.2f}s")
+
+    @property
+    def ready(self) -> bool:
+        """Whether the models are loaded and warm."""
+        future = self._ready_future
+        return future is not None and future.done() and future.exception() is None
+
+    def submit(self, img, detector_backend: Optional[str] = None) -> Future:
+        """
+        Queue an image for emotion analysis without blocking.
+
+        In thread mode the array is handed to the worker by reference, so the
+        caller must not modify it afterwards. In process mode it is pickled
+        across to the worker process.
+
+        Args:
+            img: BGR numpy array (or image path)
+            detector_backend: Override the face detector, e.g. "skip" for pre-cropped faces
+
+        Returns:
+            Future resolving to the list of DeepFace face analyses
+        """
+        self.start()
+        self._submitted += 1
+        submitted_at = time.monotonic()
+
+        future = self._executor.submit(_run_analysis, img, detector_backend)
+        future.add_done_callback(lambda f: self._on_done(f, submitted_at))
+        return future
+
+    def submit_batch(self, faces: List[Any]) -> Future:
+        """
+        Queue a batch of cropped faces for a single batched model call.
+
+        Args:
+            faces: BGR numpy arrays, each already cropped to a single face
+
+        Returns:
+            Future resolving to one emotion probability dictionary per face
+        """
+        self.start()
+        self._submitted += 1
+        submitted_at = time.monotonic()
+
+        future = self._executor.submit(_predict_batch, faces)
+        future.add_done_callback(lambda f: self._on_done(f, submitted_at))
+        return future
+
+    def _on_done(self, future: Future, submitted_at: float):
+        """Update inference counters."""
+        self._total_inference_time += time.monotonic() - submitted_at
+
+        if future.cancelled() or future.exception() is not None:
+            self._failed += 1
+        else:
+            self._completed += 1
+
+    def result(self, future: Future, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Wait for a submitted analysis.
+
+        Args:
+            future: Future returned by submit()
+            timeout: Maximum seconds to wait
+
+        Returns:
+            List of face analyses, or None if the analysis timed out
+
+        Raises:
+            Exception: Whatever the analysis raised (e.g. no face detected)
+        """
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.warning(f"Emotion analysis did not finish within {timeout}s")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get engine statistics.
+
+        Returns:
+            Dictionary with readiness, load time and inference counters
+        """
+        finished = self._completed + self._failed
+
+        return {
+            "mode": "process" if self.use_process_pool else "thread",
+            "ready": self.ready,
+            "load_time": round(self._load_time, 3) if self._load_time is not None else None,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "pending": self._submitted - finished,
+            "avg_inference_time": round(self._total_inference_time / finished, 3) if finished else None
+        }
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stop the worker.
+
+        Args:
+            wait: Block until queued analyses have finished
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+                self._ready_future = None
+
+class BatchCollector:
+    """Groups face crops arriving close together into one batched inference call."""
+
+    def __init__(self, engine: EmotionEngine, window: float = 0.05, max_batch_size: int = 8):
+        """
+        Initialize the batch collector.
+
+        Args:
+            engine: Engine that runs the batched model call
+            window: Seconds to wait after the first crop for others to join the batch
+            max_batch_size: Dispatch immediately once this many crops are waiting
+        """
+        self.engine = engine
+        self.window = window
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._condition = threading.Condition()
+        self._pending = []
+        self._thread = threading.Thread(target=self._dispatch_loop, name="emotion-batcher", daemon=True)
+        self._thread.start()
+
+        self._batches = 0
+        self._faces = 0
+
+    def submit(self, face) -> Future:
+        """
+        Add a face crop to the next batch.
+
+        Args:
+            face: BGR numpy array cropped to a single face
+
+        Returns:
+            Future resolving to that face's emotion probability dictionary
+        """
+        future = Future()
+
+        with self._condition:
+            self._pending.append((face, future))
+            self._condition.notify()
+
+        return future
+
+    def _dispatch_loop(self):
+        """Collect crops for up to one window, then hand them to the engine together."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+
+                deadline = time.monotonic() + self.window
+                while len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = self._pending[:self.max_batch_size]
+                self._pending = self._pending[self.max_batch_size:]
+
+            self._batches += 1
+            self._faces += len(batch)
+
+            futures = [future for _, future in batch]
+            batch_future = self.engine.submit_batch([face for face, _ in batch])
+            batch_future.add_done_callback(lambda f, futures=futures: self._distribute(f, futures))
+
+    @staticmethod
+    def _distribute(batch_future: Future, futures: List[Future]):
+        """Resolve each caller's future from the batch result."""
+        # exception() raises CancelledError for a batch dropped by shutdown(); pass the cancellation on
+        if batch_future.cancelled():
+            for future in futures:
+                future.cancel()
+            return
+
+        error = batch_future.exception()
+
+        if error is not None:
+            for future in futures:
+                future.set_exception(error)
+            return
+
+        results = list(batch_future.result())
+        if len(results) != len(futures):
+            logger.error(f"Batch returned {len(results)} results for {len(futures)} faces")
+
+        for future, probabilities in zip(futures, results):
+            future.set_result(probabilities)
+
+        # Never leave a caller waiting on a face the batch dropped
+        for future in futures[len(results):]:
+            future.set_exception(RuntimeError(f"No result for face in batch of {len(futures)}"))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching statistics.
+
+        Returns:
+            Dictionary with batch count and average batch size
+        """
+        return {
+            "batches": self._batches,
+            "faces": self._faces,
+            "avg_batch_size": round(self._faces / self._batches, 2) if self._batches else None
+        }
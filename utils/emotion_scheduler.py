@@ -0,0 +1,185 @@
+import time
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+SCREEN_OFF_EMOTION = "Screen operation is off"
+
+class EmotionScheduler:
+    """Runs emotion detection periodically and caches the latest result for all clients."""
+
+    def __init__(self,
+                 detect_fn: Callable[[], Dict[str, Any]],
+                 interval: float,
+                 is_active_fn: Optional[Callable[[], bool]] = None,
+                 idle_after: float = 120,
+                 max_interval: float = 300,
+                 backoff_factor: float = 2.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            detect_fn: Runs one capture+inference cycle and returns a result dict
+                       with at least "emotion" and "face_detected"
+            interval: Base seconds between detection runs
+            is_active_fn: Returns False when detection should be skipped (e.g. screen off)
+            idle_after: Seconds without a face before the interval starts backing off
+            max_interval: Upper bound for the backed-off interval
+            backoff_factor: Multiplier applied to the interval on each idle cycle
+        """
+        self.detect_fn = detect_fn
+        self.interval = interval
+        self.is_active_fn = is_active_fn
+        self.idle_after = idle_after
+        self.max_interval = max(max_interval, interval)
+        self.backoff_factor = backoff_factor
+
+        self._current_interval = interval
+        self._last_face_seen = time.time()
+        self._was_active = True
+        self._latest = None
+
+        self._wake = threading.Event()
+        self._condition = threading.Condition()
+        self._cycles_completed = 0
+        self._cycles_skipped = 0
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Start the background detection thread."""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="emotion-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Emotion scheduler started (interval {self.interval}s, max {self.max_interval}s)")
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the detection thread.
+
+        Args:
+            timeout: Seconds to wait for the current cycle to finish
+        """
+        self._running = False
+        self._wake.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """Detection loop: run a cycle, then sleep until the next one is due or a refresh is requested."""
+        while self._running:
+            self._run_cycle()
+            self._wake.wait(self._current_interval)
+            self._wake.clear()
+
+    def _run_cycle(self):
+        """Run one detection cycle and adapt the interval to what it saw."""
+        try:
+            active = self.is_active_fn is None or self.is_active_fn()
+            resumed, self._was_active = active and not self._was_active, active
+
+            if not active:
+                self._cycles_skipped += 1
+                result = {"emotion": SCREEN_OFF_EMOTION, "face_detected": False}
+                self._back_off()
+            else:
+                if resumed:
+                    # The screen came back on; don't keep the interval it backed off to while off
+                    self._current_interval = self.interval
+                    self._last_face_seen = time.time()
+
+                result = self.detect_fn()
+
+                if result.get("face_detected"):
+                    self._last_face_seen = time.time()
+                    self._current_interval = self.interval
+                elif time.time() - self._last_face_seen > self.idle_after:
+                    self._back_off()
+        except Exception as e:
+            logger.error(f"Error in scheduled emotion detection: {str(e)}")
+            result = {"emotion": "error", "face_detected": False}
+
+        result = dict(result, timestamp=time.time())
+
+        with self._condition:
+            self._latest = result
+            self._cycles_completed += 1
+            self._condition.notify_all()
+
+    def _back_off(self):
+        """Lengthen the interval up to the configured maximum."""
+        new_interval = min(self._current_interval * self.backoff_factor, self.max_interval)
+
+        if new_interval != self._current_interval:
+            logger.info(f"No activity, backing off emotion detection to every {new_interval:.0f}s")
+            self._current_interval = new_interval
+
+    def wake(self):
+        """Reset the backoff and run a cycle now, without waiting for it (e.g. when the screen turns on)."""
+        with self._condition:
+            self._current_interval = self.interval
+            self._last_face_seen = time.time()
+            self._wake.set()
+
+    def request_refresh(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Ask for a detection run now and wait for it.
+
+        Concurrent callers share the same run instead of each triggering one.
+
+        Args:
+            timeout: Maximum seconds to wait for the run to finish
+
+        Returns:
+            The latest result (see latest()), or None if nothing finished in time
+        """
+        with self._condition:
+            target = self._cycles_completed + 1
+
+            # Reset the backoff: someone is actively interested
+            self._current_interval = self.interval
+            self._last_face_seen = time.time()
+            self._wake.set()
+
+            self._condition.wait_for(lambda: self._cycles_completed >= target, timeout)
+
+        return self.latest()
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached result of the most recent detection.
+
+        Returns:
+            Result dictionary with "timestamp" and "age" in seconds, or None before the first run
+        """
+        with self._condition:
+            result = self._latest
+
+        if result is None:
+            return None
+
+        return dict(result, age=round(time.time() - result["timestamp"], 3))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics.
+
+        Returns:
+            Dictionary with the current interval and cycle counters
+        """
+        return {
+            "running": self._running,
+            "base_interval": self.interval,
+            "current_interval": self._current_interval,
+            "cycles_completed": self._cycles_completed,
+            "cycles_skipped": self._cycles_skipped,
+            "seconds_since_face": round(time.time() - self._last_face_seen, 1)
+        }
@@ -0,0 +1,101 @@
+import time
+import logging
+import threading
+from typing import Dict, Any
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+class EmotionSmoother:
+    """Streaming estimator that smooths emotion probabilities over recent frames."""
+
+    def __init__(self, alpha: float = 0.4, sad_enter: float = 40, sad_exit: float = 30, reset_after: float = 300):
+        """
+        Initialize the smoother.
+
+        Args:
+            alpha: Weight of the newest frame in the moving average (0-1]
+            sad_enter: Smoothed "sad" percentage needed to switch to sad
+            sad_exit: Smoothed "sad" percentage below which sad is left again
+            reset_after: Seconds without an update after which history is discarded
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        if sad_exit > sad_enter:
+            raise ValueError("sad_exit must not be greater than sad_enter")
+
+        self.alpha = alpha
+        self.sad_enter = sad_enter
+        self.sad_exit = sad_exit
+        self.reset_after = reset_after
+
+        self._lock = threading.Lock()
+        self._probabilities = None
+        self._is_sad = False
+        self._samples = 0
+        self._last_update = None
+
+    def reset(self):
+        """Discard the smoothed history."""
+        with self._lock:
+            self._probabilities = None
+            self._is_sad = False
+            self._samples = 0
+            self._last_update = None
+
+    def update(self, probabilities: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Fold one frame's emotion probabilities into the estimate.
+
+        Args:
+            probabilities: Emotion name to percentage (0-100), as returned by DeepFace
+
+        Returns:
+            Dictionary with the smoothed "emotion", "probabilities" and "confidence"
+        """
+        now = time.time()
+
+        with self._lock:
+            if self._last_update is not None and now - self._last_update > self.reset_after:
+                logger.debug("Emotion history expired, starting a new estimate")
+                self._probabilities = None
+                self._is_sad = False
+                self._samples = 0
+
+            if self._probabilities is None:
+                self._probabilities = {name: float(value) for name, value in probabilities.items()}
+            else:
+                for name, value in probabilities.items():
+                    previous = self._probabilities.get(name, 0.0)
+                    self._probabilities[name] = previous + self.alpha * (float(value) - previous)
+
+            self._samples += 1
+            self._last_update = now
+
+            return self._decide()
+
+    def _decide(self) -> Dict[str, Any]:
+        """Pick the reported emotion, applying hysteresis around "sad"."""
+        smoothed = self._probabilities
+        sad = smoothed.get("sad", 0.0)
+        dominant = max(smoothed, key=smoothed.get)
+
+        if self._is_sad:
+            self._is_sad = sad >= self.sad_exit
+        else:
+            self._is_sad = dominant == "sad" and sad >= self.sad_enter
+
+        if self._is_sad:
+            emotion = "sad"
+        elif dominant == "sad":
+            # Sad is on top but not convincingly enough
+            emotion = "neutral"
+        else:
+            emotion = dominant
+
+        return {
+            "emotion": emotion,
+            "probabilities": {name: round(value, 2) for name, value in smoothed.items()},
+            "confidence": round(smoothed.get(emotion, 0.0) / 100, 3),
+            "samples": self._samples
+        }
@@ -0,0 +1,205 @@
+import json
+import queue
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, AsyncIterator, Callable, Iterator, Optional
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """One connected event stream client."""
+
+    __slots__ = ("queue", "overflowed", "notify")
+
+    def __init__(self, queue_size: int, notify: Optional[Callable[[], None]] = None):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+        # Wakes an asyncio reader; thread readers block on the queue instead
+        self.notify = notify
+
+class EventHub:
+    """Fans published events out to server-sent event streams."""
+
+    def __init__(self, history_size: int = 256, queue_size: int = 64, heartbeat_interval: float = 15,
+                 retry: int = 3000):
+        """
+        Initialize the event hub.
+
+        Args:
+            history_size: Recent events kept so reconnecting clients can resume from Last-Event-ID
+            queue_size: Events buffered per client; a client that falls further behind is disconnected
+            heartbeat_interval: Seconds of silence after which a comment line is sent to keep connections open
+            retry: Reconnect delay in milliseconds suggested to clients
+        """
+        self.queue_size = queue_size
+        self.heartbeat_interval = heartbeat_interval
+        self.retry = retry
+
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._last_id = 0
+
+        self._published = 0
+        self._overflows = 0
+
+    @staticmethod
+    def format(event_id: int, event_type: Optional[str], data: str) -> str:
+        """Format one event in text/event-stream syntax."""
+        event = f"id: {event_id}\n"
+        if event_type:
+            event += f"event: {event_type}\n"
+        return event + f"data: {data}\n\n"
+
+    def publish(self, event_type: Optional[str], data: Any = "") -> int:
+        """
+        Send an event to every connected client.
+
+        Args:
+            event_type: SSE event name, or None for an unnamed "message" event
+            data: String, or anything JSON-serializable
+
+        Returns:
+            The event's id
+        """
+        if not isinstance(data, str):
+            data = json.dumps(data)
+
+        with self._lock:
+            self._last_id += 1
+            event_id = self._last_id
+            message = self.format(event_id, event_type, data)
+            self._history.append((event_id, message))
+            self._published += 1
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                # Drop the client rather than block publishers; it resumes via Last-Event-ID
+                if not subscription.overflowed:
+                    subscription.overflowed = True
+                    self._overflows += 1
+
+            if subscription.notify is not None:
+                try:
+                    subscription.notify()
+                except RuntimeError:
+                    # The reader's event loop is already closed
+                    pass
+
+        return event_id
+
+    def subscribe(self, last_event_id: Optional[str] = None,
+                  notify: Optional[Callable[[], None]] = None) -> Subscription:
+        """
+        Register a client, replaying events it missed.
+
+        Args:
+            last_event_id: Last-Event-ID sent by a reconnecting client
+            notify: Called after each event is queued for this client (from the publishing thread)
+
+        Returns:
+            The new subscription
+        """
+        subscription = Subscription(self.queue_size, notify)
+
+        with self._lock:
+            if last_event_id:
+                try:
+                    last_seen = int(last_event_id)
+                except ValueError:
+                    last_seen = -1
+
+                missed = [message for event_id, message in self._history if event_id > last_seen]
+                oldest = self._history[0][0] if self._history else self._last_id + 1
+
+                if last_seen > self._last_id or last_seen < oldest - 1 or len(missed) > self.queue_size:
+                    # Too far behind (or from before a restart): tell the client to reload everything
+                    missed = [self.format(self._last_id, None, "update")]
+
+                for message in missed:
+                    subscription.queue.put_nowait(message)
+
+            self._subscribers.add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a client."""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stream(self, last_event_id: Optional[str] = None) -> Iterator[str]:
+        """
+        Generate a client's event stream until it disconnects or falls behind.
+
+        Args:
+            last_event_id: Last-Event-ID sent by a reconnecting client
+
+        Yields:
+            text/event-stream chunks
+        """
+        subscription = self.subscribe(last_event_id)
+
+        try:
+            yield f"retry: {self.retry}\n\n"
+
+            while not subscription.overflowed:
+                try:
+                    yield subscription.queue.get(timeout=self.heartbeat_interval)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    async def astream(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Asyncio version of stream(); an idle client costs one suspended coroutine.
+
+        Args:
+            last_event_id: Last-Event-ID sent by a reconnecting client
+
+        Yields:
+            text/event-stream chunks
+        """
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        subscription = self.subscribe(last_event_id, lambda: loop.call_soon_threadsafe(wake.set))
+
+        try:
+            yield f"retry: {self.retry}\n\n"
+
+            while not subscription.overflowed:
+                wake.clear()
+
+                try:
+                    while True:
+                        yield subscription.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hub statistics.
+
+        Returns:
+            Dictionary with subscriber count, last event id and overflow count
+        """
+        return {
+            "subscribers": len(self._subscribers),
+            "last_event_id": self._last_id,
+            "published": self._published,
+            "overflows": self._overflows
+        }
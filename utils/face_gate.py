@@ -0,0 +1,123 @@
+import cv2
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+class FaceGate:
+    """Cheap pre-stage that decides whether a frame is worth running the emotion model on."""
+
+    def __init__(self,
+                 scale_width: int = 320,
+                 motion_threshold: float = 0.01,
+                 min_face_size: int = 40,
+                 roi_size: int = 224,
+                 roi_padding: float = 0.2,
+                 cascade_file: str = "haarcascade_frontalface_default.xml"):
+        """
+        Initialize the face gate.
+
+        Args:
+            scale_width: Width frames are downscaled to before motion and face detection
+            motion_threshold: Fraction of changed pixels that counts as motion (0 disables motion gating)
+            min_face_size: Smallest face, in full-frame pixels, that is accepted
+            roi_size: Side length of the square face crop handed to the emotion model
+            roi_padding: Extra margin around the detected face, as a fraction of its size
+            cascade_file: OpenCV Haar cascade file name (looked up in cv2.data.haarcascades)
+        """
+        self.scale_width = scale_width
+        self.motion_threshold = motion_threshold
+        self.min_face_size = min_face_size
+        self.roi_size = roi_size
+        self.roi_padding = roi_padding
+
+        self._cascade = cv2.CascadeClassifier(cv2.data.haarcascades + cascade_file)
+        if self._cascade.empty():
+            raise RuntimeError(f"Could not load face cascade {cascade_file}")
+
+        self._lock = threading.Lock()
+        self._previous = None
+        self._face_in_last_frame = False
+
+        self._frames_seen = 0
+        self._skipped_no_motion = 0
+        self._skipped_no_face = 0
+        self._gate_time = 0.0
+
+    def process(self, frame) -> Optional[Any]:
+        """
+        Look for a face in a frame.
+
+        Args:
+            frame: BGR numpy array
+
+        Returns:
+            Square BGR crop of the largest face, or None if the frame should be skipped
+        """
+        started = time.perf_counter()
+
+        try:
+            with self._lock:
+                self._frames_seen += 1
+                return self._find_face(frame)
+        finally:
+            self._gate_time += time.perf_counter() - started
+
+    def _find_face(self, frame) -> Optional[Any]:
+        """Run motion and face detection on a downscaled grayscale copy."""
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.scale_width / width)
+
+        small = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        # Motion check: a still scene that had no face last time still has no face
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        previous, self._previous = self._previous, blurred
+
+        if self.motion_threshold > 0 and previous is not None and not self._face_in_last_frame:
+            diff = cv2.absdiff(previous, blurred)
+            _, changed = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)
+            if cv2.countNonZero(changed) < self.motion_threshold * changed.size:
+                self._skipped_no_motion += 1
+                return None
+
+        min_size = max(1, int(self.min_face_size * scale))
+        faces = self._cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_size, min_size))
+
+        if len(faces) == 0:
+            self._face_in_last_frame = False
+            self._skipped_no_face += 1
+            return None
+
+        self._face_in_last_frame = True
+
+        # Largest face, mapped back to full-frame coordinates with some margin
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        x, y, w, h = (int(v / scale) for v in (x, y, w, h))
+        pad = int(max(w, h) * self.roi_padding)
+
+        x0, y0 = max(0, x - pad), max(0, y - pad)
+        x1, y1 = min(width, x + w + pad), min(height, y + h + pad)
+
+        return cv2.resize(frame[y0:y1, x0:x1], (self.roi_size, self.roi_size), interpolation=cv2.INTER_AREA)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get gating statistics.
+
+        Returns:
+            Dictionary with skip counts, skip ratio and average gate time
+        """
+        skipped = self._skipped_no_motion + self._skipped_no_face
+
+        return {
+            "frames_seen": self._frames_seen,
+            "skipped_no_motion": self._skipped_no_motion,
+            "skipped_no_face": self._skipped_no_face,
+            "skip_ratio": round(skipped / self._frames_seen, 3) if self._frames_seen else 0.0,
+            "avg_gate_time": round(self._gate_time / self._frames_seen, 4) if self._frames_seen else None
+        }
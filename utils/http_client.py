@@ -0,0 +1,231 @@
+import time
+import random
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional
+
+from utils.metrics import LatencyHistogram
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures, probing again after a cooldown."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial request is allowed
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> str:
+        """Current circuit state."""
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may be sent.
+
+        Returns:
+            True if the circuit is closed, or open long enough to let one trial through
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                return True
+
+            return False
+
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        """Count a failure, opening the circuit once the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+class HttpClient:
+    """Pooled keep-alive HTTP client with retries, circuit breaking and latency tracking per endpoint."""
+
+    RETRY_STATUSES = {500, 502, 503, 504}
+
+    def __init__(self,
+                 timeout: float = 10,
+                 pool_size: int = 10,
+                 max_retries: int = 2,
+                 backoff_base: float = 0.3,
+                 backoff_max: float = 5.0,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30):
+        """
+        Initialize the HTTP client.
+
+        Args:
+            timeout: Default request timeout in seconds
+            pool_size: Connections kept alive per host; callers beyond it get a one-off connection
+            max_retries: Retries after the first attempt for timeouts, connection errors and 5xx
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_max: Upper bound for a single backoff delay
+            failure_threshold: Consecutive failed calls that open an endpoint's circuit
+            reset_timeout: Seconds an open circuit waits before allowing a trial request
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = requests.Session()
+        # A blocking pool would make extra callers wait for a free connection with no time limit,
+        # outside both the request timeout and the circuit breaker
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=False)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _endpoint(self, name: str) -> Dict[str, Any]:
+        """Get or create the breaker, histogram and counters for an endpoint."""
+        with self._lock:
+            if name not in self._endpoints:
+                self._endpoints[name] = {
+                    "breaker": CircuitBreaker(self.failure_threshold, self.reset_timeout),
+                    "latency": LatencyHistogram(),
+                    "requests": 0,
+                    "retries": 0,
+                    "errors": 0,
+                    "rejected": 0
+                }
+            return self._endpoints[name]
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url: str, endpoint: str, params: Optional[Dict[str, Any]] = None,
+            timeout: Optional[float] = None) -> requests.Response:
+        """
+        Send a GET request.
+
+        Args:
+            url: Request URL
+            endpoint: Name used to group breaker state and statistics (e.g. "opencage")
+            params: Query parameters
+            timeout: Override the default timeout
+
+        Returns:
+            The response; 5xx responses are returned once retries are exhausted
+
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+            requests.exceptions.RequestException: If every attempt failed at the transport level, or the
+                request failed in a way not worth retrying (e.g. too many redirects)
+        """
+        state = self._endpoint(endpoint)
+        breaker = state["breaker"]
+
+        if not breaker.allow():
+            state["rejected"] += 1
+            raise CircuitOpenError(f"Circuit open for {endpoint}, not calling upstream")
+
+        timeout = timeout or self.timeout
+        attempt = 0
+
+        while True:
+            state["requests"] += 1
+            started = time.perf_counter()
+
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+                error = None
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                response, error = None, e
+            except requests.exceptions.RequestException:
+                # Not worth retrying, but the breaker must still hear about it; a HALF_OPEN
+                # trial that ends without a verdict would keep the circuit shut for good
+                state["errors"] += 1
+                breaker.record_failure()
+                raise
+            finally:
+                state["latency"].observe(time.perf_counter() - started)
+
+            retryable = error is not None or response.status_code in self.RETRY_STATUSES
+
+            if not retryable:
+                breaker.record_success()
+                return response
+
+            state["errors"] += 1
+
+            if attempt >= self.max_retries:
+                breaker.record_failure()
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            state["retries"] += 1
+            delay = self._backoff(attempt)
+            reason = str(error) if error is not None else f"HTTP {response.status_code}"
+            logger.warning(f"{endpoint} request failed ({reason}), retry {attempt} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-endpoint statistics.
+
+        Returns:
+            Dictionary of endpoint name to counters, circuit state and latency histogram
+        """
+        with self._lock:
+            endpoints = dict(self._endpoints)
+
+        return {
+            name: {
+                "requests": state["requests"],
+                "retries": state["retries"],
+                "errors": state["errors"],
+                "rejected": state["rejected"],
+                "circuit": state["breaker"].state,
+                "latency": state["latency"].snapshot()
+            }
+            for name, state in endpoints.items()
+        }
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
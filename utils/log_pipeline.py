@@ -0,0 +1,356 @@
+import os
+import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
+from typing import Dict, Any, Iterable, List, Optional
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage()
+        }
+        # Records reach the writer with the traceback already rendered (see DroppingQueueHandler.prepare)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+class BatchRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that leaves flushing to the listener, once per batch instead of once per record."""
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        """Write out everything emitted since the last batch."""
+        super().flush()
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site for records below WARNING.
+
+    A log line in a hot route is emitted at most `rate` times per second on
+    average (after an initial `burst`); the rest are dropped and counted,
+    and the next emitted record from that call site says how many were
+    suppressed. Warnings and errors are never limited, and neither are
+    records from exempt loggers (or their children).
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 10, exempt: Iterable[str] = ()):
+        """
+        Initialize the filter.
+
+        Args:
+            rate: Records per second allowed per call site
+            burst: Records allowed at once before limiting starts
+            exempt: Logger names whose records always pass
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.exempt = tuple(exempt)
+
+        self._lock = threading.Lock()
+        # (logger name, path, line) -> [tokens, last refill, suppressed]
+        self._buckets = {}
+        self._suppressed_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        if any(record.name == name or record.name.startswith(name + ".") for name in self.exempt):
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = record.created
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] < 1:
+                bucket[2] += 1
+                self._suppressed_total += 1
+                return False
+
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+    @property
+    def suppressed(self) -> int:
+        return self._suppressed_total
+
+_exception_formatter = logging.Formatter()
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the logging thread; records are dropped if the writer falls behind."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the message arguments and render the traceback, keeping it in exc_text.
+
+        The base implementation folds the traceback into the message and
+        clears exc_text, which leaves formatters nothing to put in a
+        separate exception field.
+        """
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogPipeline:
+    """
+    Queue-based logging: callers only enqueue records, one background thread formats and writes them.
+
+    The writer drains the queue in batches and flushes its handlers once per
+    batch, lingering up to flush_interval for more records first so bursts
+    become a single write. Errors are flushed straight away.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], queue_size: int = 10000,
+                 max_batch: int = 256, flush_interval: float = 0.5):
+        """
+        Initialize the pipeline.
+
+        Args:
+            handlers: Handlers records are written to from the writer thread
+            queue_size: Records buffered before new ones are dropped
+            max_batch: Records written per batch at most
+            flush_interval: Seconds to wait for more records before flushing a batch
+        """
+        self.handlers = handlers
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = DroppingQueueHandler(self.queue)
+
+        self._thread = None
+        self._stopping = False
+        self._batches = 0
+        self._records = 0
+
+    def start(self):
+        """Start the writer thread."""
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def _collect(self, first: logging.LogRecord) -> List[logging.LogRecord]:
+        """Gather a batch starting with an already dequeued record."""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.max_batch and batch[-1] is not None and batch[-1].levelno < logging.ERROR:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect(self.queue.get())
+
+            for record in batch:
+                if record is None:
+                    continue
+                self._records += 1
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+
+            for handler in self.handlers:
+                try:
+                    if isinstance(handler, BatchRotatingFileHandler):
+                        handler.flush_batch()
+                    else:
+                        handler.flush()
+                except Exception as e:
+                    # Nowhere left to log it; never let the writer thread die
+                    sys.stderr.write(f"Error flushing log handler: {str(e)}\n")
+            self._batches += 1
+
+            if batch[-1] is None:
+                return
+
+    def stop(self, timeout: float = 5.0):
+        """Write out everything queued and stop the writer thread."""
+        if self._thread is None or self._stopping:
+            return
+
+        self._stopping = True
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+        for handler in self.handlers:
+            handler.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pipeline statistics.
+
+        Returns:
+            Dictionary with queued, written, dropped and batch counts
+        """
+        return {
+            "queued": self.queue.qsize(),
+            "records": self._records,
+            "batches": self._batches,
+            "dropped": self.queue_handler.dropped
+        }
+
+_pipeline = None
+_rate_limit = None
+_lock = threading.Lock()
+
+def configure_logging(log_file: str, level: str = "INFO", log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                      json_lines: bool = False, console: bool = True, max_bytes: int = 10485760,
+                      backup_count: int = 5, rate_limit: Optional[float] = 1.0, rate_burst: int = 10,
+                      rate_exempt: Iterable[str] = ("werkzeug",), flush_interval: float = 0.5) -> LogPipeline:
+    """
+    Route all logging through one queue and background writer.
+
+    The root logger gets the queue handler, so every project logger (which
+    propagates to it) shares the pipeline. Calling this again replaces the
+    previous pipeline after writing out what it had queued.
+
+    Args:
+        log_file: Rotating log file
+        level: Root log level
+        log_format: Format for plain text output
+        json_lines: Write the log file as JSON lines instead of plain text
+        console: Also write to stderr
+        max_bytes: Size at which the log file is rotated
+        backup_count: Rotated files kept
+        rate_limit: Records per second allowed per call site below WARNING, None to disable
+        rate_burst: Records allowed at once per call site before limiting starts
+        rate_exempt: Loggers never rate limited, such as werkzeug's one-line-per-request access log
+        flush_interval: Seconds the writer waits to batch records before flushing
+
+    Returns:
+        The running pipeline
+    """
+    global _pipeline, _rate_limit
+
+    file_handler = BatchRotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter(log_format))
+    handlers = [file_handler]
+
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(log_format))
+        handlers.append(console_handler)
+
+    pipeline = LogPipeline(handlers, flush_interval=flush_interval)
+    if rate_limit:
+        _rate_limit = RateLimitFilter(rate_limit, rate_burst, rate_exempt)
+        pipeline.queue_handler.addFilter(_rate_limit)
+
+    root = logging.getLogger()
+
+    with _lock:
+        previous, _pipeline = _pipeline, pipeline
+        pipeline.start()
+        root.addHandler(pipeline.queue_handler)
+        root.setLevel(getattr(logging, level))
+
+        if previous is not None:
+            root.removeHandler(previous.queue_handler)
+        else:
+            atexit.register(shutdown_logging)
+
+    if previous is not None:
+        previous.stop()
+
+    return pipeline
+
+def configure_from_config(log_name: str) -> LogPipeline:
+    """
+    Configure the pipeline from the LOG_* settings in config.
+
+    Args:
+        log_name: Log file name inside config.LOGS_DIR
+
+    Returns:
+        The running pipeline
+    """
+    import config
+
+    config.ensure_directories()
+    return configure_logging(
+        os.path.join(config.LOGS_DIR, log_name),
+        level=config.LOG_LEVEL,
+        log_format=config.LOG_FORMAT,
+        json_lines=config.LOG_JSON,
+        console=config.LOG_CONSOLE,
+        max_bytes=config.LOG_FILE_MAX_BYTES,
+        backup_count=config.LOG_FILE_BACKUP_COUNT,
+        rate_limit=config.LOG_RATE_LIMIT,
+        rate_burst=config.LOG_RATE_BURST,
+        rate_exempt=config.LOG_RATE_EXEMPT,
+        flush_interval=config.LOG_FLUSH_INTERVAL
+    )
+
+def shutdown_logging():
+    """Write out queued records and stop the writer; registered with atexit."""
+    with _lock:
+        pipeline = _pipeline
+
+    if pipeline is not None:
+        pipeline.stop()
+
+def logging_stats() -> Dict[str, Any]:
+    """
+    Get statistics for the current pipeline.
+
+    Returns:
+        Dictionary with pipeline counters and records suppressed by rate limiting
+    """
+    stats = _pipeline.stats() if _pipeline is not None else {}
+    stats["suppressed"] = _rate_limit.suppressed if _rate_limit is not None else 0
+    return stats
@@ -0,0 +1,247 @@
+import bisect
+import logging
+import threading
+from typing import Dict, Any, Callable, Iterable, List, Optional, Sequence
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latencies are mostly well under a second
+ROUTE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram with fixed bucket boundaries.
+
+    observe() is a bisect and three additions under an uncontended lock,
+    cheap enough to call on every request.
+    """
+
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets: Upper bounds in seconds, ascending
+        """
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Record one duration."""
+        index = bisect.bisect_left(self.buckets, seconds)
+
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the histogram contents.
+
+        Returns:
+            Dictionary with per-bucket counts (keyed by upper bound), sum and count
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, counts)),
+            "sum": round(total, 6),
+            "count": count,
+            "avg": round(total / count, 4) if count else None
+        }
+
+class Metric:
+    """One metric family ready to be rendered: name, type, help text and samples."""
+
+    __slots__ = ("name", "kind", "documentation", "samples")
+
+    def __init__(self, name: str, kind: str, documentation: str):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        # (name suffix, labels, value)
+        self.samples = []
+
+    def add(self, value: Optional[float], labels: Optional[Dict[str, str]] = None, suffix: str = "") -> "Metric":
+        """Add a sample; None values are skipped."""
+        if value is not None:
+            self.samples.append((suffix, labels or {}, value))
+        return self
+
+    def add_histogram(self, snapshot: Dict[str, Any], labels: Optional[Dict[str, str]] = None) -> "Metric":
+        """Add the samples of a LatencyHistogram snapshot."""
+        labels = labels or {}
+        cumulative = 0
+
+        for bound, count in snapshot["buckets"].items():
+            cumulative += count
+            self.samples.append(("_bucket", dict(labels, le=bound), cumulative))
+
+        self.samples.append(("_sum", labels, snapshot["sum"]))
+        self.samples.append(("_count", labels, snapshot["count"]))
+        return self
+
+def gauge(name: str, documentation: str, value: Optional[float] = None,
+          labels: Optional[Dict[str, str]] = None) -> Metric:
+    """Create a gauge, optionally with a first sample."""
+    return Metric(name, "gauge", documentation).add(value, labels)
+
+def counter(name: str, documentation: str, value: Optional[float] = None,
+            labels: Optional[Dict[str, str]] = None) -> Metric:
+    """Create a counter, optionally with a first sample."""
+    return Metric(name, "counter", documentation).add(value, labels)
+
+class HistogramFamily:
+    """Latency histograms keyed by label values."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> LatencyHistogram:
+        """Get the histogram for a set of label values."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, LatencyHistogram(self.buckets))
+        return child
+
+    def observe(self, seconds: float, *values: str):
+        """Record one duration for a set of label values."""
+        self.labels(*values).observe(seconds)
+
+    def collect(self) -> Metric:
+        metric = Metric(self.name, "histogram", self.documentation)
+        for values, child in list(self._children.items()):
+            metric.add_histogram(child.snapshot(), dict(zip(self.label_names, values)))
+        return metric
+
+class CounterFamily:
+    """Monotonic counters keyed by label values."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values: str, amount: float = 1):
+        """Increment the counter for a set of label values."""
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def collect(self) -> Metric:
+        metric = Metric(self.name, "counter", self.documentation)
+        with self._lock:
+            items = list(self._values.items())
+        for values, value in items:
+            metric.add(value, dict(zip(self.label_names, values)))
+        return metric
+
+class MetricsRegistry:
+    """
+    Metrics rendered in the Prometheus text format.
+
+    Hot paths record into histograms and counters created here; everything
+    else is pulled from the services' existing stats() by collector
+    callbacks when /metrics is scraped, so it costs nothing in between.
+    """
+
+    def __init__(self):
+        self._families = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = ROUTE_BUCKETS) -> HistogramFamily:
+        """Create and register a histogram family."""
+        family = HistogramFamily(name, documentation, label_names, buckets)
+        with self._lock:
+            self._families.append(family)
+        return family
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> CounterFamily:
+        """Create and register a counter family."""
+        family = CounterFamily(name, documentation, label_names)
+        with self._lock:
+            self._families.append(family)
+        return family
+
+    def register_collector(self, collector: Callable[[], Iterable[Metric]]):
+        """
+        Register a callback that returns metrics at scrape time.
+
+        Args:
+            collector: Returns Metric objects, e.g. built from a service's stats()
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> List[Metric]:
+        """Gather all metrics; a failing collector is logged and skipped."""
+        with self._lock:
+            families, collectors = list(self._families), list(self._collectors)
+
+        metrics = [family.collect() for family in families]
+        for collector in collectors:
+            try:
+                metrics.extend(collector())
+            except Exception as e:
+                logger.error(f"Error collecting metrics: {str(e)}")
+        return metrics
+
+    def render(self) -> bytes:
+        """
+        Render all metrics for a scrape.
+
+        Returns:
+            Prometheus text exposition format body
+        """
+        lines = []
+        for metric in self.collect():
+            if not metric.samples:
+                continue
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples:
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
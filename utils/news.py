@@ -1,23 +1,739 @@
-import re
+import os
+import json
+import mmap
+import time
+import struct
 import logging
 import random
-from typing import Dict, List, Optional, Any
+import threading
+from array import array
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Any, Iterable, Iterator
 from pathlib import Path
 
+from utils.news_search import NewsSearchIndex
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
+TITLE_PREFIX = "Title: "
+DESCRIPTION_PREFIX = "Description: "
+DATE_PREFIX = "Date: "
+
+class NewsEntry:
+    """A single parsed news entry."""
+    
+    __slots__ = ("title", "description", "date")
+    
+    def __init__(self, title: str, description: str, date: str):
+        self.title = title
+        self.description = description
+        self.date = date
+        
+    def to_dict(self) -> Dict[str, str]:
+        """Convert the entry to the dictionary served by the API."""
+        return {"title": self.title, "description": self.description, "date": self.date}
+
+def iter_news_lines(lines: Iterable[str]) -> Iterator[NewsEntry]:
+    """
+    Parse news entries in a single pass over the lines of a news file.
+    
+    An entry starts at a "Title: " line; the first "Description: " and
+    "Date: " lines that follow belong to it. Entries missing any of the
+    three fields are skipped.
+    
+    Args:
+        lines: Lines of the news file (e.g. an open file object)
+        
+    Yields:
+        Parsed entries in file order
+    """
+    title = description = date = None
+    
+    for line in lines:
+        if line.startswith(TITLE_PREFIX):
+            if title and description and date:
+                yield NewsEntry(title, description, date)
+            title = line[len(TITLE_PREFIX):].strip()
+            description = date = None
+        elif title is None:
+            continue
+        elif description is None and line.startswith(DESCRIPTION_PREFIX):
+            description = line[len(DESCRIPTION_PREFIX):].strip()
+        elif date is None and line.startswith(DATE_PREFIX):
+            date = line[len(DATE_PREFIX):].strip()
+            
+    if title and description and date:
+        yield NewsEntry(title, description, date)
+
+def parse_news_lines(lines: Iterable[str]) -> List[NewsEntry]:
+    """
+    Parse all news entries from the lines of a news file.
+    
+    Args:
+        lines: Lines of the news file
+        
+    Returns:
+        List of parsed entries in file order
+    """
+    return list(iter_news_lines(lines))
+
+class NewsIndex:
+    """Parsed in-memory index of a news file, rebuilt only when the file changes."""
+    
+    def __init__(self, news_file_path: str, check_interval: float = 1.0):
+        """
+        Initialize the news index.
+        
+        Args:
+            news_file_path: Path to the news data file
+            check_interval: Minimum seconds between checks of the file's mtime and size
+        """
+        self.news_file_path = news_file_path
+        self.check_interval = check_interval
+        
+        self._lock = threading.Lock()
+        self._entries = []
+        self._signature = None
+        self._checked_at = 0.0
+        self._parse_time = None
+        self._rebuilds = 0
+        
+    def refresh(self) -> bool:
+        """
+        Re-parse the file if its mtime or size changed since the last build.
+        
+        Returns:
+            True if the index was rebuilt
+        """
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < self.check_interval:
+            return False
+            
+        with self._lock:
+            self._checked_at = now
+            
+            try:
+                stat = os.stat(self.news_file_path)
+            except FileNotFoundError:
+                self._entries, self._signature = [], None
+                return False
+                
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return False
+                
+            started = time.perf_counter()
+            with open(self.news_file_path, "r", encoding="utf-8") as file:
+                self._entries = parse_news_lines(file)
+            self._parse_time = time.perf_counter() - started
+            self._signature = signature
+            self._rebuilds += 1
+            
+        logger.info(f"Indexed {len(self._entries)} news entries in {self._parse_time * 1000:.1f}ms")
+        return True
+    
+    @property
+    def entries(self) -> List[NewsEntry]:
+        """The current list of entries, refreshed if the file changed."""
+        self.refresh()
+        return self._entries
+        
+    def __len__(self) -> int:
+        return len(self.entries)
+        
+    def get(self, position: int) -> Optional[NewsEntry]:
+        """
+        Get an entry by its position in the file.
+        
+        Args:
+            position: Zero-based entry number
+            
+        Returns:
+            The entry, or None if the position is out of range
+        """
+        entries = self.entries
+        return entries[position] if 0 <= position < len(entries) else None
+        
+    def random_entry(self) -> Optional[NewsEntry]:
+        """
+        Pick a random entry in constant time.
+        
+        Returns:
+            A random entry, or None if the index is empty
+        """
+        entries = self.entries
+        return random.choice(entries) if entries else None
+        
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+        
+        Returns:
+            Dictionary with entry count, last parse time and rebuild count
+        """
+        return {
+            "entries": len(self._entries),
+            "parse_time": round(self._parse_time, 4) if self._parse_time is not None else None,
+            "rebuilds": self._rebuilds
+        }
+
+class MappedNewsIndex:
+    """Offset index over a memory-mapped news file; entries are only decoded when selected."""
+    
+    SIDECAR_MAGIC = b"MNIX"
+    SIDECAR_VERSION = 1
+    # magic, version, file mtime_ns, file size, entry count
+    SIDECAR_HEADER = struct.Struct("<4sIqqQ")
+    
+    def __init__(self, news_file_path: str, index_path: Optional[str] = None, check_interval: float = 1.0):
+        """
+        Initialize the mapped news index.
+        
+        Args:
+            news_file_path: Path to the news data file
+            index_path: Sidecar file the entry offsets are persisted to (default: <news file>.idx)
+            check_interval: Minimum seconds between checks of the file's mtime and size
+        """
+        self.news_file_path = news_file_path
+        self.index_path = index_path or f"{news_file_path}.idx"
+        self.check_interval = check_interval
+        
+        self._lock = threading.Lock()
+        self._mmap = None
+        self._size = 0
+        self._offsets = array("Q")
+        self._signature = None
+        self._checked_at = 0.0
+        
+        self._index_time = None
+        self._rebuilds = 0
+        self._appends = 0
+        self._sidecar_loads = 0
+        self._decoded = 0
+        
+    def refresh(self) -> bool:
+        """
+        Bring the offset index up to date with the file.
+        
+        On first use the sidecar index is loaded if it matches the file. When
+        the file has only grown, just the new tail is scanned; any other change
+        triggers a full rescan.
+        
+        Returns:
+            True if the index changed
+        """
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < self.check_interval:
+            return False
+            
+        with self._lock:
+            self._checked_at = now
+            
+            try:
+                stat = os.stat(self.news_file_path)
+            except FileNotFoundError:
+                self._unmap()
+                self._offsets, self._signature = array("Q"), None
+                return False
+                
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return False
+                
+            started = time.perf_counter()
+            appended = self._signature is not None and stat.st_size > self._size
+            self._map(stat.st_size)
+            
+            if self._signature is None and self._load_sidecar(signature):
+                self._sidecar_loads += 1
+                how = "loaded from sidecar"
+            elif appended and self._offsets and self._is_entry_start(self._offsets[-1]):
+                # Re-scan from the last known entry, which may have been incomplete
+                self._offsets.extend(self._scan(self._offsets.pop()))
+                self._appends += 1
+                how = "extended"
+            else:
+                self._offsets = self._scan(0)
+                self._rebuilds += 1
+                how = "built"
+                
+            if how != "loaded from sidecar":
+                self._save_sidecar(signature)
+                
+            self._signature = signature
+            self._index_time = time.perf_counter() - started
+            
+        logger.info(f"News offset index {how}: {len(self._offsets)} entries in {self._index_time * 1000:.1f}ms")
+        return True
+    
+    def _map(self, size: int):
+        """Replace the current mapping with one of the whole file."""
+        self._unmap()
+        self._size = size
+        
+        if size == 0:
+            # mmap cannot map empty files
+            return
+            
+        with open(self.news_file_path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            
+    def _unmap(self):
+        """Release the current mapping."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._size = 0
+        
+    def _is_entry_start(self, offset: int) -> bool:
+        """Check that an offset still points at a "Title: " line."""
+        marker = TITLE_PREFIX.encode()
+        return self._mmap is not None and self._mmap[offset:offset + len(marker)] == marker
+        
+    def _scan(self, start: int) -> array:
+        """Find the offsets of all "Title: " lines from start onwards."""
+        offsets = array("Q")
+        if self._mmap is None:
+            return offsets
+            
+        if self._is_entry_start(start):
+            offsets.append(start)
+            
+        marker = b"\n" + TITLE_PREFIX.encode()
+        position = self._mmap.find(marker, start)
+        
+        while position != -1:
+            offsets.append(position + 1)
+            position = self._mmap.find(marker, position + 1)
+            
+        return offsets
+    
+    def _load_sidecar(self, signature) -> bool:
+        """Load persisted offsets if they were built for this exact file version."""
+        try:
+            with open(self.index_path, "rb") as file:
+                header = file.read(self.SIDECAR_HEADER.size)
+                magic, version, mtime_ns, size, count = self.SIDECAR_HEADER.unpack(header)
+                
+                if (magic, version, (mtime_ns, size)) != (self.SIDECAR_MAGIC, self.SIDECAR_VERSION, signature):
+                    return False
+                    
+                offsets = array("Q")
+                offsets.frombytes(file.read())
+        except FileNotFoundError:
+            return False
+        except (OSError, struct.error, ValueError) as e:
+            logger.warning(f"Ignoring unreadable news index {self.index_path}: {str(e)}")
+            return False
+            
+        if len(offsets) != count:
+            return False
+            
+        self._offsets = offsets
+        return True
+    
+    def _save_sidecar(self, signature):
+        """Persist the offsets atomically next to the news file."""
+        tmp_path = f"{self.index_path}.tmp"
+        
+        try:
+            with open(tmp_path, "wb") as file:
+                file.write(self.SIDECAR_HEADER.pack(self.SIDECAR_MAGIC, self.SIDECAR_VERSION,
+                                                    signature[0], signature[1], len(self._offsets)))
+                self._offsets.tofile(file)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.error(f"Error saving news index: {str(e)}")
+            
+    def _decode(self, position: int) -> Optional[NewsEntry]:
+        """Decode a single entry straight from the mapping."""
+        start = self._offsets[position]
+        end = self._offsets[position + 1] if position + 1 < len(self._offsets) else self._size
+        self._decoded += 1
+        
+        entries = parse_news_lines(self._mmap[start:end].decode("utf-8", errors="replace").splitlines())
+        return entries[0] if entries else None
+    
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._offsets)
+        
+    def get(self, position: int) -> Optional[NewsEntry]:
+        """
+        Get an entry by its position in the file.
+        
+        Args:
+            position: Zero-based entry number
+            
+        Returns:
+            The entry, or None if the position is out of range or the entry is incomplete
+        """
+        self.refresh()
+        with self._lock:
+            if not 0 <= position < len(self._offsets):
+                return None
+            return self._decode(position)
+        
+    def random_entry(self, attempts: int = 3) -> Optional[NewsEntry]:
+        """
+        Pick and decode a random entry.
+        
+        Args:
+            attempts: Positions to try before giving up when entries are incomplete
+            
+        Returns:
+            A random entry, or None if the index is empty
+        """
+        self.refresh()
+        with self._lock:
+            for _ in range(attempts):
+                if not self._offsets:
+                    return None
+                entry = self._decode(random.randrange(len(self._offsets)))
+                if entry is not None:
+                    return entry
+        return None
+        
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+        
+        Returns:
+            Dictionary with entry count, mapped size, index time and update counters
+        """
+        return {
+            "entries": len(self._offsets),
+            "mapped_bytes": self._size,
+            "index_time": round(self._index_time, 4) if self._index_time is not None else None,
+            "rebuilds": self._rebuilds,
+            "appends": self._appends,
+            "sidecar_loads": self._sidecar_loads,
+            "decoded": self._decoded
+        }
+
+class ShuffledDeck:
+    """
+    Lazily shuffled deck over positions 0..n-1.
+    
+    A full-period linear congruential generator walks every value below the
+    next power of two once per pass. Its low bits cycle with short periods
+    (the lowest one just alternates), so each value is put through an
+    xorshift-multiply bijection that folds the high bits down before values
+    >= n are skipped. Every position is still drawn exactly once per pass in
+    O(1) time and the whole deck state is six integers.
+    """
+    
+    __slots__ = ("n", "modulus", "multiplier", "increment", "current", "drawn")
+    
+    def __init__(self, n: int):
+        self.n = n
+        self.modulus = 1 << max(0, n - 1).bit_length()
+        # Hull-Dobell: odd increment and multiplier = 1 (mod 4) give a full period
+        self.multiplier = 4 * random.randrange(max(1, self.modulus // 4)) + 1
+        self.increment = 2 * random.randrange(max(1, self.modulus // 2)) + 1
+        self.current = random.randrange(self.modulus)
+        self.drawn = 0
+        
+    @property
+    def exhausted(self) -> bool:
+        return self.drawn >= self.n
+        
+    def draw(self) -> int:
+        """Draw the next position of this pass."""
+        while True:
+            self.current = (self.multiplier * self.current + self.increment) % self.modulus
+            position = self._mix(self.current)
+            if position < self.n:
+                self.drawn += 1
+                return position
+                
+    def _mix(self, value: int) -> int:
+        """Permute 0..modulus-1 so the output's low bits depend on the generator's high bits."""
+        shift = max(1, (self.modulus.bit_length() + 1) // 2)
+        value ^= value >> shift
+        value = (value * self.multiplier) % self.modulus
+        return value ^ (value >> shift)
+                
+    def to_list(self) -> List[int]:
+        return [self.n, self.modulus, self.multiplier, self.increment, self.current, self.drawn]
+        
+    @classmethod
+    def from_list(cls, values: List[int]) -> "ShuffledDeck":
+        deck = cls.__new__(cls)
+        deck.n, deck.modulus, deck.multiplier, deck.increment, deck.current, deck.drawn = values
+        return deck
+
+class NewsSampler:
+    """Per-mirror news sampler that avoids repeats and can favour recent entries."""
+    
+    def __init__(self,
+                 index,
+                 state_file: Optional[str] = None,
+                 recent_memory: int = 50,
+                 max_mirrors: int = 64,
+                 recency_half_life: Optional[float] = None,
+                 min_weight: float = 0.1,
+                 save_interval: float = 5.0):
+        """
+        Initialize the sampler.
+        
+        Args:
+            index: NewsIndex or MappedNewsIndex to draw from
+            state_file: JSON file decks and recent memory are persisted to
+            recent_memory: Entries per mirror that are not shown again, even across deck passes
+            max_mirrors: Mirrors remembered at once; the least recently seen is forgotten first
+            recency_half_life: Days after which an entry's weight halves (None disables weighting)
+            min_weight: Lowest weight an old or undated entry can get
+            save_interval: Minimum seconds between state file writes
+        """
+        self.index = index
+        self.state_file = state_file
+        self.recent_memory = recent_memory
+        self.max_mirrors = max_mirrors
+        self.recency_half_life = recency_half_life
+        self.min_weight = min_weight
+        self.save_interval = save_interval
+        
+        self._lock = threading.Lock()
+        self._mirrors = OrderedDict()
+        self._dirty = False
+        self._saved_at = 0.0
+        
+        self._draws = 0
+        self._skipped_recent = 0
+        self._rejected_by_weight = 0
+        self._fallbacks = 0
+        
+        self._load()
+        
+    def _load(self):
+        """Restore decks and recent memory from the state file."""
+        if not self.state_file:
+            return
+            
+        try:
+            with open(self.state_file, "r") as f:
+                data = json.load(f)
+                
+            for mirror_id, state in data.get("mirrors", {}).items():
+                self._mirrors[mirror_id] = {
+                    "deck": ShuffledDeck.from_list(state["deck"]) if state.get("deck") else None,
+                    "recent": OrderedDict((position, None) for position in state.get("recent", []))
+                }
+            logger.info(f"Restored news sampler state for {len(self._mirrors)} mirror(s)")
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error loading news sampler state: {str(e)}")
+            
+    def save(self):
+        """Write the sampler state atomically if it changed."""
+        if not self.state_file:
+            return
+            
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "mirrors": {
+                    mirror_id: {
+                        "deck": state["deck"].to_list() if state["deck"] else None,
+                        "recent": list(state["recent"])
+                    }
+                    for mirror_id, state in self._mirrors.items()
+                }
+            }
+            self._dirty = False
+            self._saved_at = time.monotonic()
+            
+        tmp_path = f"{self.state_file}.tmp"
+        
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.state_file)
+        except OSError as e:
+            logger.error(f"Error saving news sampler state: {str(e)}")
+            
+    def _mirror(self, mirror_id: str) -> Dict[str, Any]:
+        """Get a mirror's state, creating it and evicting the least recently seen mirror if needed."""
+        state = self._mirrors.get(mirror_id)
+        
+        if state is None:
+            state = self._mirrors[mirror_id] = {"deck": None, "recent": OrderedDict()}
+            while len(self._mirrors) > self.max_mirrors:
+                self._mirrors.popitem(last=False)
+        else:
+            self._mirrors.move_to_end(mirror_id)
+            
+        return state
+    
+    def weight(self, entry: NewsEntry) -> float:
+        """
+        Weight of an entry based on the age of its Date field.
+        
+        Args:
+            entry: The news entry
+            
+        Returns:
+            Weight in [min_weight, 1]
+        """
+        if not self.recency_half_life:
+            return 1.0
+            
+        try:
+            published = parsedate_to_datetime(entry.date).timestamp()
+        except (TypeError, ValueError):
+            return self.min_weight
+            
+        age_days = max(0.0, time.time() - published) / 86400
+        return max(self.min_weight, 0.5 ** (age_days / self.recency_half_life))
+    
+    def draw(self, mirror_id: str = "default", max_attempts: int = 32) -> Optional[NewsEntry]:
+        """
+        Draw the next entry for a mirror.
+        
+        Each mirror walks its own shuffled deck, so nothing repeats until every
+        entry was shown. Recently shown entries are also skipped across passes,
+        and with recency weighting older entries are accepted less often.
+        
+        Args:
+            mirror_id: Identifies the mirror (or client) the entry is shown on
+            max_attempts: Candidates to try before falling back to a plain random entry
+            
+        Returns:
+            A news entry, or None if the index is empty
+        """
+        count = len(self.index)
+        if count == 0:
+            return None
+            
+        with self._lock:
+            state = self._mirror(mirror_id)
+            recent = state["recent"]
+            # Remember at most half the corpus so small corpora still have candidates left
+            memory = min(self.recent_memory, count // 2)
+            while len(recent) > memory:
+                recent.popitem(last=False)
+            
+            for _ in range(max_attempts):
+                deck = state["deck"]
+                if deck is None or deck.n != count or deck.exhausted:
+                    deck = state["deck"] = ShuffledDeck(count)
+                    
+                position = deck.draw()
+                
+                if position in recent:
+                    self._skipped_recent += 1
+                    continue
+                    
+                entry = self.index.get(position)
+                if entry is None:
+                    continue
+                    
+                if self.recency_half_life and random.random() > self.weight(entry):
+                    self._rejected_by_weight += 1
+                    continue
+                    
+                save_due = self._remember(recent, position, memory)
+                break
+            else:
+                self._fallbacks += 1
+                entry, save_due = None, False
+                
+        if save_due:
+            self.save()
+            
+        return entry if entry is not None else self.index.random_entry()
+        
+    def _remember(self, recent: OrderedDict, position: int, memory: int) -> bool:
+        """Record a shown position; returns True if a state save is due."""
+        recent[position] = None
+        recent.move_to_end(position)
+        while len(recent) > memory:
+            recent.popitem(last=False)
+            
+        self._draws += 1
+        self._dirty = True
+        return time.monotonic() - self._saved_at >= self.save_interval
+        
+    def pick(self, mirror_id: str, positions: List[int], top: int = 5) -> Optional[int]:
+        """
+        Pick one of a ranked list of positions for a mirror.
+        
+        Positions the mirror was recently shown are passed over; one of the
+        best remaining ones is chosen at random so repeated queries vary.
+        
+        Args:
+            mirror_id: Identifies the mirror (or client) the entry is shown on
+            positions: Candidate positions, best first
+            top: Number of best remaining candidates to choose from
+            
+        Returns:
+            The chosen position, or None if there are no candidates
+        """
+        if not positions:
+            return None
+            
+        with self._lock:
+            state = self._mirror(mirror_id)
+            recent = state["recent"]
+            fresh = [position for position in positions if position not in recent]
+            self._skipped_recent += len(positions) - len(fresh)
+            
+            # Every candidate was shown recently: show the least recently shown one again
+            if not fresh:
+                fresh = sorted(positions, key=list(recent).index)[:1]
+                
+            position = random.choice(fresh[:top])
+            memory = min(self.recent_memory, len(self.index) // 2)
+            save_due = self._remember(recent, position, memory)
+            
+        if save_due:
+            self.save()
+            
+        return position
+        
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get sampler statistics.
+        
+        Returns:
+            Dictionary with mirror count, draws and skip counters
+        """
+        return {
+            "mirrors": len(self._mirrors),
+            "draws": self._draws,
+            "skipped_recent": self._skipped_recent,
+            "rejected_by_weight": self._rejected_by_weight,
+            "fallbacks": self._fallbacks
+        }
+
 class NewsService:
     """Service for handling news data and processing."""
     
-    def __init__(self, news_file_path: str):
+    def __init__(self,
+                 news_file_path: str,
+                 use_mmap: bool = False,
+                 sampler_file: Optional[str] = None,
+                 recency_half_life: Optional[float] = None):
         """
         Initialize the news service.
         
         Args:
             news_file_path: Path to the news data file
+            use_mmap: Memory-map the file and decode entries on demand instead of parsing
+                      it all into memory, for large corpora
+            sampler_file: JSON file the per-mirror no-repeat sampler state is persisted to
+            recency_half_life: Days after which a news entry is half as likely to be picked
+                               (None picks regardless of age)
         """
         self.news_file_path = news_file_path
+        self.index = MappedNewsIndex(news_file_path) if use_mmap else NewsIndex(news_file_path)
+        self.sampler = NewsSampler(self.index, sampler_file, recency_half_life=recency_half_life)
+        self.search = NewsSearchIndex(self.index)
         
     def _ensure_file_exists(self) -> bool:
         """
@@ -27,7 +743,9 @@ class NewsService:
             True if the file exists or was created, False otherwise
         """
         try:
-            Path(self.news_file_path).touch(exist_ok=True)
+            # Only create it: touching an existing file would change its mtime and force a re-index
+            if not os.path.exists(self.news_file_path):
+                Path(self.news_file_path).touch()
             return True
         except Exception as e:
             logger.error(f"Error creating news file: {str(e)}")
@@ -62,33 +780,7 @@ class NewsService:
             List of news entry dictionaries with title, description, and date
         """
         try:
-            entries = []
-            
-            # Split the data into individual news entries
-            # Assuming each entry starts with "Title: "
-            raw_entries = re.split(r"(?=Title: )", data)
-            
-            # Remove any empty entries
-            raw_entries = [entry for entry in raw_entries if entry.strip()]
-            
-            for entry in raw_entries:
-                try:
-                    # Extract title, description, and date
-                    title_match = re.search(r"Title: (.*?)(?=$|\n)", entry)
-                    description_match = re.search(r"Description: (.*?)(?=$|\n)", entry)
-                    date_match = re.search(r"Date: (.*?)(?=$|\n)", entry)
-                    
-                    if title_match and description_match and date_match:
-                        news_entry = {
-                            "title": title_match.group(1).strip(),
-                            "description": description_match.group(1).strip(),
-                            "date": date_match.group(1).strip()
-                        }
-                        entries.append(news_entry)
-                except Exception as e:
-                    logger.warning(f"Error parsing news entry: {str(e)}")
-                    continue
-                    
+            entries = [entry.to_dict() for entry in parse_news_lines(data.splitlines())]
             logger.info(f"Parsed {len(entries)} news entries")
             return entries
             
@@ -96,35 +788,64 @@ class NewsService:
             logger.error(f"Error parsing news data: {str(e)}")
             return []
     
-    def get_random_happy_news(self) -> Optional[Dict[str, str]]:
+    def _get_index(self):
+        """Get the news index, making sure the file exists first."""
+        if not self._ensure_file_exists():
+            return None
+        return self.index
+    
+    def get_random_happy_news(self, mirror_id: str = "default") -> Optional[Dict[str, str]]:
         """
-        Get a random happy news entry.
+        Get a random happy news entry, not repeating one until all were shown.
         
+        Args:
+            mirror_id: Mirror the entry is shown on; each mirror has its own rotation
+            
         Returns:
             Random news entry or None if no entries available
         """
         try:
-            # Read and parse the news file
-            data = self.read_news_file()
+            entry = self.sampler.draw(mirror_id) if self._get_index() else None
             
-            if not data:
-                logger.warning("No news data available")
+            if entry is None:
+                logger.warning("No valid news entries found")
                 return None
                 
-            entries = self.parse_news_entries(data)
+            logger.info(f"Selected random news entry: {entry.title}")
+            return entry.to_dict()
             
-            if not entries:
-                logger.warning("No valid news entries found")
+        except Exception as e:
+            logger.error(f"Error getting random news: {str(e)}")
+            return None
+    
+    def get_happy_news_for_topic(self, topic: str, mirror_id: str = "default") -> Optional[Dict[str, str]]:
+        """
+        Get a happy news entry about a topic.
+        
+        Args:
+            topic: Topic name (e.g. "animals", "science", "local") or keywords
+            mirror_id: Mirror the entry is shown on, used to avoid recent repeats
+            
+        Returns:
+            One of the best matching entries, or None if nothing matches
+        """
+        try:
+            if not self._get_index():
                 return None
                 
-            # Select a random entry
-            random_entry = random.choice(entries)
+            results = self.search.search(topic)
+            position = self.sampler.pick(mirror_id, [position for position, _ in results])
+            entry = self.index.get(position) if position is not None else None
             
-            logger.info(f"Selected random news entry: {random_entry['title']}")
-            return random_entry
+            if entry is None:
+                logger.info(f"No news entries found for topic '{topic}'")
+                return None
+                
+            logger.info(f"Selected news entry for topic '{topic}': {entry.title}")
+            return entry.to_dict()
             
         except Exception as e:
-            logger.error(f"Error getting random news: {str(e)}")
+            logger.error(f"Error searching news: {str(e)}")
             return None
     
     def get_first_news_entry(self) -> Optional[Dict[str, str]]:
@@ -135,23 +856,25 @@ class NewsService:
             First news entry or None if no entries available
         """
         try:
-            # Read and parse the news file
-            data = self.read_news_file()
+            index = self._get_index()
+            entry = index.get(0) if index else None
             
-            if not data:
-                logger.warning("No news data available")
-                return None
-                
-            entries = self.parse_news_entries(data)
-            
-            if not entries:
+            if entry is None:
                 logger.warning("No valid news entries found")
                 return None
                 
-            # Return the first entry
-            logger.info(f"Retrieved first news entry: {entries[0]['title']}")
-            return entries[0]
+            logger.info(f"Retrieved first news entry: {entry.title}")
+            return entry.to_dict()
             
         except Exception as e:
             logger.error(f"Error getting first news entry: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get news service statistics.
+        
+        Returns:
+            Dictionary with news index, sampler and search statistics
+        """
+        return {"index": self.index.stats(), "sampler": self.sampler.stats(), "search": self.search.stats()}
@@ -0,0 +1,249 @@
+import os
+import re
+import sys
+import html
+import fcntl
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Any, Iterator, IO, Optional, Set, Union
+from xml.etree import ElementTree
+
+from utils.news import NewsEntry, iter_news_lines, TITLE_PREFIX, DESCRIPTION_PREFIX, DATE_PREFIX
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+ITEM_TAGS = {"item", "entry"}  # RSS, Atom
+TITLE_TAGS = ("title",)
+DESCRIPTION_TAGS = ("description", "summary", "encoded", "content")
+DATE_TAGS = ("pubDate", "published", "updated", "date")
+
+TAG_RE = re.compile(r"<[^>]+>")
+WHITESPACE_RE = re.compile(r"\s+")
+TRAILER_RE = re.compile(r"\s*The post .*? appeared first on .*$", re.DOTALL)
+
+def local_name(tag: str) -> str:
+    """Strip the namespace from an ElementTree tag ("{ns}entry" -> "entry")."""
+    return tag.rsplit("}", 1)[-1]
+
+def clean_text(text: Optional[str]) -> str:
+    """
+    Turn feed markup into a single line of plain text.
+
+    Tags are dropped, HTML entities decoded (feeds often double-encode them,
+    e.g. "&amp;#8217;") and the "The post ... appeared first on ..." trailer
+    removed.
+
+    Args:
+        text: Raw title or description text
+
+    Returns:
+        Cleaned single-line text
+    """
+    if not text:
+        return ""
+
+    text = html.unescape(TAG_RE.sub(" ", html.unescape(text)))
+    text = TRAILER_RE.sub("", text)
+    return WHITESPACE_RE.sub(" ", text).strip()
+
+def normalize_date(value: Optional[str]) -> str:
+    """
+    Convert an RSS (RFC 822) or Atom (ISO 8601) date to RFC 822.
+
+    Args:
+        value: Raw date text
+
+    Returns:
+        RFC 822 date, or the stripped input if it could not be parsed
+    """
+    value = (value or "").strip()
+
+    try:
+        return format_datetime(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return format_datetime(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    except ValueError:
+        return value
+
+def content_hash(title: str, description: str) -> int:
+    """
+    Hash an entry's cleaned, case-folded text for duplicate detection.
+
+    Returns:
+        64-bit hash as an integer
+    """
+    text = f"{clean_text(title).casefold()}\n{clean_text(description).casefold()}"
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+def iter_feed_entries(source: Union[str, IO[bytes]]) -> Iterator[NewsEntry]:
+    """
+    Stream news entries out of an RSS or Atom document.
+
+    Items are cleared and detached from the tree as soon as they are read,
+    so memory stays bounded regardless of the size of the feed.
+
+    Args:
+        source: Path or binary file object of the feed XML
+
+    Yields:
+        Cleaned entries in document order
+    """
+    stack = []
+
+    for event, elem in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+
+        stack.pop()
+
+        if local_name(elem.tag) not in ITEM_TAGS:
+            continue
+
+        fields = {}
+        for child in elem:
+            name = local_name(child.tag)
+            # Atom <content>/<summary> may carry the markup as child nodes
+            fields.setdefault(name, "".join(child.itertext()))
+
+        title = clean_text(next((fields[tag] for tag in TITLE_TAGS if fields.get(tag)), ""))
+        description = clean_text(next((fields[tag] for tag in DESCRIPTION_TAGS if fields.get(tag)), ""))
+        date = normalize_date(next((fields[tag] for tag in DATE_TAGS if fields.get(tag)), ""))
+
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+        if title and description and date:
+            yield NewsEntry(title, description, date)
+
+def format_entry(entry: NewsEntry) -> str:
+    """Format an entry as a block of the news file."""
+    return f"{TITLE_PREFIX}{entry.title}\n{DESCRIPTION_PREFIX}{entry.description}\n{DATE_PREFIX}{entry.date}\n\n"
+
+class FeedIngestor:
+    """Appends new, de-duplicated feed entries to a news file without rewriting it."""
+
+    def __init__(self, news_file_path: str, batch_size: int = 200):
+        """
+        Initialize the ingestor.
+
+        Args:
+            news_file_path: News file to append to
+            batch_size: Entries written per append
+        """
+        self.news_file_path = news_file_path
+        self.batch_size = batch_size
+        self._hashes = None
+
+    def known_hashes(self) -> Set[int]:
+        """
+        Hash every entry already in the news file (streamed, computed once).
+
+        Returns:
+            Set of content hashes
+        """
+        if self._hashes is None:
+            self._hashes = set()
+
+            try:
+                with open(self.news_file_path, "r", encoding="utf-8") as f:
+                    for entry in iter_news_lines(f):
+                        self._hashes.add(content_hash(entry.title, entry.description))
+            except FileNotFoundError:
+                pass
+
+        return self._hashes
+
+    def _append(self, blocks):
+        """
+        Append formatted blocks in one locked write.
+
+        The file is opened in append mode and never truncated; a partial write
+        at worst leaves an incomplete last entry, which the parser skips.
+        """
+        with open(self.news_file_path, "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                prefix = b""
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        prefix = b"\n"
+
+                f.write(prefix + "".join(blocks).encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def ingest(self, source: Union[str, IO[bytes]]) -> Dict[str, Any]:
+        """
+        Ingest one feed document.
+
+        Args:
+            source: Path or binary file object of the feed XML
+
+        Returns:
+            Dictionary with counts of seen, added and duplicate entries
+        """
+        hashes = self.known_hashes()
+        result = {"seen": 0, "added": 0, "duplicates": 0}
+        batch = []
+
+        for entry in iter_feed_entries(source):
+            result["seen"] += 1
+            digest = content_hash(entry.title, entry.description)
+
+            if digest in hashes:
+                result["duplicates"] += 1
+                continue
+
+            hashes.add(digest)
+            batch.append(format_entry(entry))
+
+            if len(batch) >= self.batch_size:
+                self._append(batch)
+                result["added"] += len(batch)
+                batch = []
+
+        if batch:
+            self._append(batch)
+            result["added"] += len(batch)
+
+        logger.info(f"Ingested {source if isinstance(source, str) else 'feed'}: {result}")
+        return result
+
+def main(argv=None) -> int:
+    """Command line entry point: python -m utils.news_ingest FEED [FEED ...]."""
+    import config
+
+    parser = argparse.ArgumentParser(description="Append new entries from RSS/Atom feeds to the happy news file")
+    parser.add_argument("feeds", nargs="+", help="Feed XML files")
+    parser.add_argument("--output", default=config.HAPPY_NEWS_FILE, help="News file to append to")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=config.LOG_LEVEL, format=config.LOG_FORMAT, datefmt=config.LOG_DATE_FORMAT)
+    config.ensure_directories()
+    ingestor = FeedIngestor(args.output)
+    failed = False
+
+    for feed in args.feeds:
+        try:
+            result = ingestor.ingest(feed)
+            print(f"{feed}: {result['added']} added, {result['duplicates']} duplicates, {result['seen']} seen")
+        except (OSError, ElementTree.ParseError) as e:
+            logger.error(f"Error ingesting {feed}: {str(e)}")
+            failed = True
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
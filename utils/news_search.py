@@ -0,0 +1,211 @@
+import re
+import math
+import time
+import heapq
+import logging
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have he her his in is it its of on or she that the their they this to
+was were will with who after over into about more new says said up out than but not all one two been
+""".split())
+
+# Topics users can ask for, expanded to the words that usually signal them
+TOPIC_KEYWORDS = {
+    "animals": ["animal", "dog", "puppy", "cat", "kitten", "wildlife", "bird", "horse", "whale", "dolphin",
+                "elephant", "bear", "turtle", "pet", "rescue", "zoo", "species", "shelter"],
+    "science": ["science", "scientist", "research", "researcher", "study", "discovery", "discover", "space",
+                "nasa", "physics", "biology", "experiment", "university", "breakthrough", "technology"],
+    "health": ["health", "medical", "doctor", "hospital", "cure", "treatment", "cancer", "patient", "vaccine",
+               "disease", "therapy", "nurse", "surgery"],
+    "environment": ["environment", "climate", "forest", "tree", "ocean", "plastic", "solar", "wind", "energy",
+                    "renewable", "recycling", "conservation", "planet", "nature", "reef"],
+    "local": ["local", "community", "neighbor", "neighbour", "town", "city", "village", "volunteer", "school",
+              "church", "library", "resident", "park"],
+    "kindness": ["kind", "kindness", "donate", "donation", "charity", "help", "stranger", "generous", "gift",
+                 "hero", "save", "surprise"]
+}
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into normalized search terms.
+
+    Terms are lower-cased, stopwords dropped and a plural "s" stripped, so
+    "Dogs" and "dog" match.
+    """
+    terms = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+class NewsSearchIndex:
+    """Incremental inverted index with BM25 ranking over a news index."""
+
+    def __init__(self, index, title_weight: int = 2, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the search index.
+
+        Args:
+            index: NewsIndex or MappedNewsIndex whose entries are searched
+            title_weight: How many times title terms count compared to description terms
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.index = index
+        self.title_weight = title_weight
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.Lock()
+        self._reset()
+
+        self._build_time = None
+        self._rebuilds = 0
+        self._queries = 0
+        self._last_query_time = None
+
+    def _reset(self):
+        """Drop all postings."""
+        # term -> (entry positions, term frequencies), both in position order
+        self._postings = {}
+        self._lengths = array("I")
+        self._total_length = 0
+        self._last_title = None
+
+    def sync(self) -> int:
+        """
+        Index entries added to the news file since the last sync.
+
+        The file is normally only appended to, so only new entries are
+        indexed; if the last indexed entry moved or vanished, the index is
+        rebuilt from scratch.
+
+        Returns:
+            Number of entries indexed
+        """
+        count = len(self.index)
+
+        with self._lock:
+            indexed = len(self._lengths)
+
+            if indexed:
+                last = self.index.get(indexed - 1) if count >= indexed else None
+                if count < indexed or (last.title if last else None) != self._last_title:
+                    self._reset()
+                    self._rebuilds += 1
+                    indexed = 0
+
+            if indexed == count:
+                return 0
+
+            started = time.perf_counter()
+
+            for position in range(indexed, count):
+                entry = self.index.get(position)
+                terms = Counter()
+
+                if entry is not None:
+                    for term in tokenize(entry.title):
+                        terms[term] += self.title_weight
+                    terms.update(tokenize(entry.description))
+                self._last_title = entry.title if entry is not None else None
+
+                for term, frequency in terms.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = (array("I"), array("H"))
+                    postings[0].append(position)
+                    postings[1].append(min(frequency, 65535))
+
+                length = sum(terms.values())
+                self._lengths.append(length)
+                self._total_length += length
+
+            self._build_time = time.perf_counter() - started
+
+        logger.info(f"Indexed {count - indexed} news entries for search in {self._build_time * 1000:.1f}ms")
+        return count - indexed
+
+    def expand(self, query: str) -> List[str]:
+        """
+        Turn a query into search terms, expanding known topic names.
+
+        Args:
+            query: Topic name (e.g. "animals") or free-text keywords
+
+        Returns:
+            Distinct search terms
+        """
+        words = []
+        for word in query.lower().replace(",", " ").split():
+            words.extend(TOPIC_KEYWORDS.get(word, [word]))
+        return list(dict.fromkeys(tokenize(" ".join(words))))
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """
+        Rank entries against a topic or keyword query with BM25.
+
+        Args:
+            query: Topic name or keywords
+            limit: Maximum number of results
+
+        Returns:
+            (entry position, score) pairs, best first
+        """
+        self.sync()
+        terms = self.expand(query)
+        started = time.perf_counter()
+
+        with self._lock:
+            documents = len(self._lengths)
+            if not documents or not terms:
+                return []
+
+            average_length = self._total_length / documents or 1.0
+            scores = {}
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+
+                positions, frequencies = postings
+                idf = math.log(1 + (documents - len(positions) + 0.5) / (len(positions) + 0.5))
+
+                for position, frequency in zip(positions, frequencies):
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[position] / average_length)
+                    scores[position] = scores.get(position, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            results = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            self._queries += 1
+            self._last_query_time = time.perf_counter() - started
+
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get search index statistics.
+
+        Returns:
+            Dictionary with document and term counts, build and query timings
+        """
+        return {
+            "documents": len(self._lengths),
+            "terms": len(self._postings),
+            "build_time": round(self._build_time, 4) if self._build_time is not None else None,
+            "rebuilds": self._rebuilds,
+            "queries": self._queries,
+            "last_query_time": round(self._last_query_time, 6) if self._last_query_time is not None else None
+        }
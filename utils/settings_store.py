@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Known settings and their types; unknown keys are kept as they are
+SETTINGS_SCHEMA = {
+    "city": str,
+    "country": str,
+    "newsSource": str,
+    "openWeatherApiKey": str
+}
+
+def validate_settings(settings: Any) -> Dict[str, Any]:
+    """
+    Check settings against SETTINGS_SCHEMA.
+
+    Args:
+        settings: Parsed settings
+
+    Returns:
+        The settings
+
+    Raises:
+        ValueError: If the settings are not an object or a known field has the wrong type
+    """
+    if not isinstance(settings, dict):
+        raise ValueError("Settings must be a JSON object")
+
+    for key, expected in SETTINGS_SCHEMA.items():
+        if key in settings and not isinstance(settings[key], expected):
+            raise ValueError(f"Setting '{key}' must be of type {expected.__name__}")
+
+    return settings
+
+class SettingsStore:
+    """Cached, validated user settings with atomic writes and external edit detection."""
+
+    def __init__(self, settings_file: str, check_interval: float = 1.0):
+        """
+        Initialize the settings store.
+
+        Args:
+            settings_file: JSON file the settings are stored in
+            check_interval: Minimum seconds between checks of the file for external edits
+        """
+        self.settings_file = settings_file
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._settings = {}
+        self._body = b"{}"
+        self._etag = self._make_etag(self._body)
+        self._signature = None
+        self._checked_at = 0.0
+        self._subscribers = []
+
+        self._loads = 0
+        self._writes = 0
+
+    @staticmethod
+    def _make_etag(body: bytes) -> str:
+        return hashlib.sha1(body).hexdigest()[:16]
+
+    @staticmethod
+    def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def _set(self, settings: Dict[str, Any], signature) -> bool:
+        """Replace the cached settings; returns True if they changed."""
+        changed = settings != self._settings
+        self._settings = settings
+        self._body = json.dumps(settings).encode("utf-8")
+        self._etag = self._make_etag(self._body)
+        self._signature = signature
+        return changed
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the file if it was edited outside of this store.
+
+        Args:
+            force: Check the file even if it was checked less than check_interval ago
+
+        Returns:
+            True if the settings changed
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+
+        with self._lock:
+            self._checked_at = now
+            signature = self._file_signature(self.settings_file)
+
+            if signature == self._signature:
+                return False
+
+            try:
+                with open(self.settings_file, "r") as f:
+                    settings = validate_settings(json.load(f))
+            except FileNotFoundError:
+                settings = {}
+            except ValueError as e:
+                # Keep serving the last good settings until the file is fixed
+                logger.error(f"Error loading user settings: {str(e)}")
+                self._signature = signature
+                return False
+
+            self._loads += 1
+            changed = self._set(settings, signature)
+            snapshot = dict(settings)
+
+        if changed:
+            self._notify(snapshot)
+        return changed
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Get the current settings.
+
+        Returns:
+            A copy of the settings dictionary
+        """
+        self.refresh()
+        return dict(self._settings)
+
+    def serialized(self) -> Tuple[bytes, str]:
+        """
+        Get the settings as served by /data.
+
+        Returns:
+            (JSON body, ETag) tuple
+        """
+        self.refresh()
+        with self._lock:
+            return self._body, self._etag
+
+    def update(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge non-empty values into the settings and write them through.
+
+        Concurrent updates are serialized, and the file is replaced atomically
+        so readers never see a partially written file.
+
+        Args:
+            changes: Settings to change; empty values are ignored
+
+        Returns:
+            The merged settings
+
+        Raises:
+            ValueError: If the merged settings are invalid
+            OSError: If the file could not be written
+        """
+        self.refresh(force=True)
+
+        with self._lock:
+            settings = dict(self._settings)
+            settings.update({key: value for key, value in changes.items() if value})
+            validate_settings(settings)
+
+            tmp_path = f"{self.settings_file}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(settings, f)
+            os.replace(tmp_path, self.settings_file)
+
+            self._writes += 1
+            changed = self._set(settings, self._file_signature(self.settings_file))
+            snapshot = dict(settings)
+
+        if changed:
+            self._notify(snapshot)
+        return snapshot
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Register a callback for settings changes.
+
+        Args:
+            callback: Called with the new settings after every change, including external edits
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def _notify(self, settings: Dict[str, Any]):
+        """Call subscribers outside of the lock."""
+        for callback in list(self._subscribers):
+            try:
+                callback(dict(settings))
+            except Exception as e:
+                logger.error(f"Error in settings subscriber: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary with load and write counts
+        """
+        return {"loads": self._loads, "writes": self._writes, "etag": self._etag}
@@ -0,0 +1,168 @@
+import sys
+import time
+import builtins
+import importlib
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Optional
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+class ImportTimer:
+    """
+    Context manager that times the modules imported inside its block.
+
+    Only first-time imports made directly from the block are recorded;
+    their own dependencies count towards them. Imports from other threads
+    are not affected.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.total = None
+        self._original = None
+        self._thread = None
+        self._depth = 0
+        self._started = 0.0
+
+    def __enter__(self) -> "ImportTimer":
+        self._original = builtins.__import__
+        self._thread = threading.get_ident()
+        self._started = time.perf_counter()
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.__import__ = self._original
+        self.total = time.perf_counter() - self._started
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if threading.get_ident() != self._thread or self._depth or level or name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+
+        self._depth += 1
+        started = time.perf_counter()
+
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    def summary(self, limit: int = 8) -> str:
+        """
+        Format the slowest imports for a log line.
+
+        Args:
+            limit: Number of modules to list
+
+        Returns:
+            e.g. "flask 120ms, utils.weather 35ms"
+        """
+        slowest = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in slowest) or "none"
+
+class BackgroundLoader:
+    """Imports a heavy module and runs its warm-up on a background thread, reporting progress."""
+
+    PENDING = "pending"
+    IMPORTING = "importing"
+    WARMING_UP = "warming_up"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, module_name: str, warm_up: Optional[Callable[[Any], Optional[Future]]] = None):
+        """
+        Initialize the loader.
+
+        Args:
+            module_name: Module to import
+            warm_up: Called with the imported module; may return a Future to wait for
+        """
+        self.module_name = module_name
+        self.warm_up = warm_up
+
+        self.state = self.PENDING
+        self.module = None
+        self.error = None
+        self.import_timer = None
+
+        self._thread = None
+        self._ready = threading.Event()
+        self._started_at = None
+        self._finished_at = None
+        self._import_time = None
+        self._warm_up_time = None
+
+    def start(self):
+        """Start loading in the background (only once)."""
+        if self._thread is not None:
+            return
+
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"load-{self.module_name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.state = self.IMPORTING
+
+            with ImportTimer() as timer:
+                module = importlib.import_module(self.module_name)
+
+            self.import_timer = timer
+            self._import_time = timer.total
+            self.module = module
+            logger.info(f"Imported {self.module_name} in {timer.total:.2f}s ({timer.summary()})")
+
+            if self.warm_up is not None:
+                self.state = self.WARMING_UP
+                started = time.perf_counter()
+                result = self.warm_up(module)
+                if isinstance(result, Future):
+                    result.result()
+                self._warm_up_time = time.perf_counter() - started
+                logger.info(f"Warmed up {self.module_name} in {self._warm_up_time:.2f}s")
+
+            self.state = self.READY
+        except Exception as e:
+            self.error = str(e)
+            self.state = self.FAILED
+            logger.error(f"Error loading {self.module_name}: {str(e)}")
+        finally:
+            self._finished_at = time.perf_counter()
+            self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == self.READY
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for loading to finish.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            True if the module is ready
+        """
+        self._ready.wait(timeout)
+        return self.ready
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Get loading progress.
+
+        Returns:
+            Dictionary with state, elapsed seconds, import and warm-up times and any error
+        """
+        return {
+            "state": self.state,
+            "elapsed": round((self._finished_at or time.perf_counter()) - self._started_at, 2) if self._started_at else None,
+            "import_time": round(self._import_time, 2) if self._import_time is not None else None,
+            "warm_up_time": round(self._warm_up_time, 2) if self._warm_up_time is not None else None,
+            "error": self.error
+        }
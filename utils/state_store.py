@@ -0,0 +1,304 @@
+import os
+import json
+import time
+import socket
+import logging
+import threading
+import socketserver
+from dataclasses import dataclass, field, asdict, fields, replace
+from typing import Dict, Any, Callable, List, Optional
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+@dataclass
+class MirrorState:
+    """Shared runtime state of the mirror."""
+    screen_on: bool = True
+    emotion: str = "neutral"
+    probabilities: Dict[str, float] = field(default_factory=dict)
+    confidence: Optional[float] = None
+    sources: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    emotion_updated_at: Optional[float] = None
+    screen_updated_at: Optional[float] = None
+
+    def copy(self) -> "MirrorState":
+        """Copy the state so callers cannot mutate the store's dictionaries."""
+        return replace(self, probabilities=dict(self.probabilities), sources=dict(self.sources))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the state to a JSON-serializable dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MirrorState":
+        """Build a state from a dictionary, ignoring unknown keys."""
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+class StateStore:
+    """In-memory state store with change notifications and batched crash-recovery snapshots."""
+
+    # Change notifications are available to callers in this process
+    supports_subscribe = True
+
+    def __init__(self, snapshot_path: str, flush_interval: float = 5.0, screen_file: Optional[str] = None):
+        """
+        Initialize the state store.
+
+        Args:
+            snapshot_path: JSON file the state is periodically snapshotted to
+            flush_interval: Seconds between snapshot checks; changes in between are batched
+            screen_file: Legacy screen_operation.txt that external tools may still write "on"/"off" to
+        """
+        self.snapshot_path = snapshot_path
+        self.flush_interval = flush_interval
+        self.screen_file = screen_file
+
+        self._lock = threading.Lock()
+        self._state = MirrorState()
+        self._version = 0
+        self._flushed_version = 0
+        self._subscribers = []
+        self._screen_file_mtime = None
+
+        self._thread = None
+        self._running = False
+        self._server = None
+
+    def start(self):
+        """Restore the last snapshot and start the background flush thread."""
+        if self._running:
+            return
+
+        self._load_snapshot()
+        self._check_screen_file()
+
+        self._running = True
+        self._thread = threading.Thread(target=self._flush_loop, name="state-store", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write a final snapshot."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(self.flush_interval + 1)
+            self._thread = None
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+        self.flush()
+
+    def get(self) -> MirrorState:
+        """
+        Get a copy of the current state.
+
+        Returns:
+            The current MirrorState
+        """
+        with self._lock:
+            return self._state.copy()
+
+    def update(self, **changes) -> List[str]:
+        """
+        Update state fields and notify subscribers of the ones that changed.
+
+        Args:
+            **changes: MirrorState field values
+
+        Returns:
+            Names of the fields whose value changed
+        """
+        with self._lock:
+            changed = [name for name, value in changes.items() if getattr(self._state, name) != value]
+
+            if not changed:
+                return []
+
+            self._state = replace(self._state, **changes)
+            self._version += 1
+            state = self._state.copy()
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(changed, state)
+            except Exception as e:
+                logger.error(f"Error in state subscriber: {str(e)}")
+
+        return changed
+
+    def subscribe(self, callback: Callable[[List[str], MirrorState], None]) -> Callable[[], None]:
+        """
+        Register a callback for state changes.
+
+        Args:
+            callback: Called with (changed field names, new state) after every change
+
+        Returns:
+            Function that removes the subscription
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _load_snapshot(self):
+        """Restore state from the last snapshot, if any."""
+        try:
+            with open(self.snapshot_path, "r") as f:
+                data = json.load(f)
+
+            with self._lock:
+                self._state = MirrorState.from_dict(data)
+            logger.info(f"State restored from {self.snapshot_path}")
+        except FileNotFoundError:
+            logger.info("No state snapshot found, starting fresh")
+        except (ValueError, TypeError) as e:
+            logger.error(f"Error loading state snapshot: {str(e)}")
+
+    def flush(self) -> bool:
+        """
+        Write a snapshot if anything changed since the last one.
+
+        The file is replaced atomically, so a crash mid-write never leaves a
+        truncated snapshot behind.
+
+        Returns:
+            True if a snapshot was written
+        """
+        with self._lock:
+            if self._version == self._flushed_version:
+                return False
+            version = self._version
+            data = self._state.to_dict()
+
+        tmp_path = f"{self.snapshot_path}.tmp"
+
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.snapshot_path)
+            self._flushed_version = version
+            return True
+        except Exception as e:
+            logger.error(f"Error writing state snapshot: {str(e)}")
+            return False
+
+    def _check_screen_file(self):
+        """Pick up screen state written to the legacy file by external tools."""
+        if not self.screen_file:
+            return
+
+        try:
+            mtime = os.path.getmtime(self.screen_file)
+            if mtime == self._screen_file_mtime:
+                return
+            self._screen_file_mtime = mtime
+
+            with open(self.screen_file, "r") as f:
+                screen_on = f.read().strip().lower() == "on"
+
+            if self.update(screen_on=screen_on, screen_updated_at=time.time()):
+                logger.info(f"Screen operation changed to {'on' if screen_on else 'off'}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error checking screen operation file: {str(e)}")
+
+    def _flush_loop(self):
+        """Batch snapshots and legacy file checks into one periodic pass."""
+        while self._running:
+            time.sleep(self.flush_interval)
+            self._check_screen_file()
+            self.flush()
+
+    def serve(self, socket_path: str):
+        """
+        Expose the state to other processes over a Unix socket.
+
+        Each connection receives the current state as one JSON document.
+
+        Args:
+            socket_path: Filesystem path of the Unix socket
+        """
+        store = self
+
+        class StateRequestHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                self.request.sendall(json.dumps(store.get().to_dict()).encode("utf-8"))
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        self._server = socketserver.ThreadingUnixStreamServer(socket_path, StateRequestHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="state-server", daemon=True).start()
+        logger.info(f"Serving mirror state on {socket_path}")
+
+class StateClient:
+    """Read-only view of a StateStore served by another process."""
+
+    # Changes happen in the owning process, so there is nothing to notify subscribers of here
+    supports_subscribe = False
+
+    def __init__(self, socket_path: str, cache_ttl: float = 0.5, timeout: float = 1.0):
+        """
+        Initialize the state client.
+
+        Args:
+            socket_path: Unix socket the owning StateStore serves on
+            cache_ttl: Seconds a fetched state is reused before asking again
+            timeout: Socket timeout in seconds
+        """
+        self.socket_path = socket_path
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._cached = None
+        self._fetched_at = 0.0
+
+    def get(self) -> MirrorState:
+        """
+        Get the current state from the owning process.
+
+        Returns:
+            The current MirrorState, or the last known one if the owner is unreachable
+        """
+        with self._lock:
+            if self._cached is not None and time.monotonic() - self._fetched_at < self.cache_ttl:
+                return self._cached
+
+            try:
+                self._cached = MirrorState.from_dict(self._fetch())
+                self._fetched_at = time.monotonic()
+            except (OSError, ValueError) as e:
+                logger.error(f"Error reading state from {self.socket_path}: {str(e)}")
+                if self._cached is None:
+                    return MirrorState(emotion="error")
+
+            return self._cached
+
+    def _fetch(self) -> Dict[str, Any]:
+        """Read one JSON state document from the socket."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+
+        return json.loads(b"".join(chunks))
@@ -1,23 +1,363 @@
+import os
+import json
+import time
+import hashlib
+import asyncio
 import requests
 import logging
-from typing import Dict, Any, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+
+from utils.http_client import HttpClient
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# Fields of the OneCall "current" section the mirror actually displays
+CURRENT_FIELDS = ("dt", "sunrise", "sunset", "temp", "feels_like", "humidity", "pressure",
+                  "clouds", "visibility", "wind_speed", "wind_deg", "uvi")
+CONDITION_FIELDS = ("id", "main", "description", "icon")
+
+def project_weather(weather_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a OneCall response to the compact schema served to the frontend.
+
+    Args:
+        weather_data: Raw OneCall response
+
+    Returns:
+        Dictionary with location metadata and the displayed "current" fields
+    """
+    current = weather_data.get("current", {})
+
+    projected_current = {name: current[name] for name in CURRENT_FIELDS if name in current}
+    projected_current["weather"] = [
+        {name: condition[name] for name in CONDITION_FIELDS if name in condition}
+        for condition in current.get("weather", [])[:1]
+    ]
+
+    return {
+        "lat": weather_data.get("lat"),
+        "lon": weather_data.get("lon"),
+        "timezone": weather_data.get("timezone"),
+        "timezone_offset": weather_data.get("timezone_offset"),
+        "current": projected_current
+    }
+
+class WeatherPayload:
+    """Projected weather data, serialized once with its ETag."""
+
+    __slots__ = ("data", "body", "etag")
+
+    def __init__(self, weather_data: Dict[str, Any]):
+        """
+        Project and serialize a OneCall response.
+
+        Args:
+            weather_data: Raw OneCall response
+        """
+        self.data = project_weather(weather_data)
+        self.body = json.dumps(self.data, separators=(",", ":")).encode("utf-8")
+        self.etag = hashlib.sha1(self.body).hexdigest()[:16]
+
+class WeatherCache:
+    """TTL cache with stale-while-revalidate and single-flight refreshes."""
+
+    def __init__(self, ttl: float = 600, max_stale: float = 10800):
+        """
+        Initialize the weather cache.
+
+        Args:
+            ttl: Seconds an entry is fresh and served without refreshing
+            max_stale: Seconds past which a stale entry is no longer served while
+                       refreshing; it is still used as a last resort if the refresh fails
+        """
+        self.ttl = ttl
+        self.max_stale = max_stale
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = {}
+
+        self._stats = {"hits": 0, "misses": 0, "stale_hits": 0, "refreshes": 0,
+                       "refresh_failures": 0, "fallbacks": 0}
+
+    def get(self, key: Hashable, fetch: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """
+        Get a value, fetching or refreshing it as needed.
+
+        Args:
+            key: Cache key
+            fetch: Produces a fresh value, or None on failure
+
+        Returns:
+            The cached or freshly fetched value, or None if nothing is available
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                age = now - entry[1]
+
+                if age < self.ttl:
+                    self._stats["hits"] += 1
+                    return entry[0]
+
+                if age < self.max_stale:
+                    # Serve stale data right away and refresh behind the caller
+                    self._stats["stale_hits"] += 1
+                    self._start_background_refresh(key, fetch)
+                    return entry[0]
+
+            self._stats["misses"] += 1
+            done, owner = self._claim_refresh(key)
+
+        # The first caller to miss fetches; concurrent callers wait for its result
+        if owner:
+            self._refresh(key, fetch, done)
+        else:
+            done.wait()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        if time.time() - entry[1] >= self.ttl:
+            self._stats["fallbacks"] += 1
+            logger.warning(f"Serving last known good weather data for {key}")
+
+        return entry[0]
+
+    def _claim_refresh(self, key: Hashable) -> Tuple[threading.Event, bool]:
+        """
+        Register a refresh for a key unless one is already running. Must hold the lock.
+
+        Returns:
+            Tuple of (event set when the refresh finishes, whether the caller must run it)
+        """
+        done = self._inflight.get(key)
+        if done is not None:
+            return done, False
+
+        done = threading.Event()
+        self._inflight[key] = done
+        return done, True
+
+    def _start_background_refresh(self, key: Hashable, fetch: Callable[[], Optional[Any]]):
+        """Refresh a key on a background thread unless a refresh is already running. Must hold the lock."""
+        done, owner = self._claim_refresh(key)
+
+        if owner:
+            threading.Thread(target=self._refresh, args=(key, fetch, done), name="weather-refresh", daemon=True).start()
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Optional[Any]], done: threading.Event):
+        """Fetch a value, store it if successful, and wake any waiters."""
+        try:
+            value = fetch()
+        except Exception as e:
+            logger.error(f"Error refreshing weather cache: {str(e)}")
+            value = None
+
+        with self._lock:
+            self._stats["refreshes"] += 1
+            if value is not None:
+                self._entries[key] = (value, time.time())
+            else:
+                self._stats["refresh_failures"] += 1
+            del self._inflight[key]
+
+        done.set()
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a value only if it is fresh, without fetching or counting a lookup.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The fresh cached value, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            return entry[0]
+        return None
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store a value fetched outside the cache (e.g. by a prefetcher).
+
+        Args:
+            key: Cache key
+            value: Fresh value
+        """
+        with self._lock:
+            self._entries[key] = (value, time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss/refresh counters and number of entries
+        """
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), refreshing=len(self._inflight))
+
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 3) if lookups else None
+        return stats
+
+class GeocodeCache:
+    """Persistent city/country to coordinates cache stored as a JSON index."""
+
+    def __init__(self, cache_file: str, negative_ttl: float = 86400):
+        """
+        Initialize the geocode cache and load it from disk.
+
+        Args:
+            cache_file: JSON file the cache is persisted to
+            negative_ttl: Seconds an unknown location is remembered as unknown (0 disables)
+        """
+        self.cache_file = cache_file
+        self.negative_ttl = negative_ttl
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._hits = 0
+        self._misses = 0
+
+        self.load()
+
+    @staticmethod
+    def normalize(city: str, country: str) -> str:
+        """
+        Build a case- and whitespace-insensitive key for a location.
+
+        Args:
+            city: City name
+            country: Country name
+
+        Returns:
+            Normalized "city,country" key
+        """
+        return f"{' '.join(city.split()).casefold()},{' '.join(country.split()).casefold()}"
+
+    def load(self):
+        """Load cached locations from disk, if the cache file exists."""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+
+            with self._lock:
+                self._entries = entries
+            logger.info(f"Loaded {len(entries)} cached locations from {self.cache_file}")
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError) as e:
+            logger.error(f"Error loading geocode cache: {str(e)}")
+
+    def _save(self):
+        """Write the cache to disk atomically. Must hold the lock."""
+        tmp_path = f"{self.cache_file}.tmp"
+
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            logger.error(f"Error saving geocode cache: {str(e)}")
+
+    def get(self, city: str, country: str) -> Tuple[bool, Optional[Tuple[float, float]]]:
+        """
+        Look up a location.
+
+        Args:
+            city: City name
+            country: Country name
+
+        Returns:
+            Tuple of (found in cache, coordinates or None for a known-unknown location)
+        """
+        key = self.normalize(city, country)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and "lat" in entry:
+                self._hits += 1
+                return True, (entry["lat"], entry["lng"])
+
+            if entry is not None and time.time() - entry.get("missing_at", 0) < self.negative_ttl:
+                self._hits += 1
+                return True, None
+
+            self._misses += 1
+            return False, None
+
+    def put(self, city: str, country: str, coordinates: Optional[Tuple[float, float]]):
+        """
+        Store a lookup result and persist the cache.
+
+        Args:
+            city: City name
+            country: Country name
+            coordinates: (latitude, longitude), or None if the location does not exist
+        """
+        if coordinates is None and not self.negative_ttl:
+            return
+
+        key = self.normalize(city, country)
+        entry = {"lat": coordinates[0], "lng": coordinates[1]} if coordinates else {"missing_at": time.time()}
+
+        with self._lock:
+            self._entries[key] = entry
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters and number of entries
+        """
+        return {"hits": self._hits, "misses": self._misses, "entries": len(self._entries)}
+
 class WeatherService:
     """Service for fetching and processing weather data."""
     
-    def __init__(self, opencage_api_key: str, weather_api_timeout: int = 10):
+    GEOCODE_URL = "https://api.opencagedata.com/geocode/v1/json"
+    WEATHER_URL = "https://api.openweathermap.org/data/3.0/onecall"
+    
+    def __init__(self, opencage_api_key: str, weather_api_timeout: int = 10, refresh_interval: int = 600,
+                 geocode_cache_file: Optional[str] = None, http_client: Optional[HttpClient] = None,
+                 geocode_url: Optional[str] = None, weather_url: Optional[str] = None):
         """
         Initialize the weather service.
         
         Args:
             opencage_api_key: API key for OpenCage geocoding service
             weather_api_timeout: Timeout for API requests in seconds
+            refresh_interval: Seconds weather data is served from cache before refreshing
+            geocode_cache_file: JSON file to persist geocoding results in (None disables)
+            http_client: Pooled HTTP client shared by both providers (created if omitted)
+            geocode_url: Override the OpenCage endpoint, e.g. to point at a local stub server
+            weather_url: Override the OpenWeather endpoint, e.g. to point at a local stub server
         """
         self.opencage_api_key = opencage_api_key
         self.timeout = weather_api_timeout
+        self.http = http_client or HttpClient(timeout=weather_api_timeout)
+        self.geocode_url = geocode_url or self.GEOCODE_URL
+        self.weather_url = weather_url or self.WEATHER_URL
+        self.cache = WeatherCache(ttl=refresh_interval)
+        self.geocode_cache = GeocodeCache(geocode_cache_file) if geocode_cache_file else None
         
     def get_coordinates(self, city: str, country: str) -> Optional[Tuple[float, float]]:
         """
@@ -30,21 +370,34 @@ class WeatherService:
         Returns:
             Tuple of (latitude, longitude) or None if geocoding failed
         """
+        if self.geocode_cache is not None:
+            found, coordinates = self.geocode_cache.get(city, country)
+            if found:
+                logger.debug(f"Coordinates for {city}, {country} served from cache")
+                return coordinates
+        
         try:
-            geocode_url = f"https://api.opencagedata.com/geocode/v1/json?q={city},+{country}&key={self.opencage_api_key}"
+            params = {"q": f"{city}, {country}", "key": self.opencage_api_key}
             
             logger.info(f"Fetching coordinates for {city}, {country}")
-            geocode_response = requests.get(geocode_url, timeout=self.timeout)
+            geocode_response = self.http.get(self.geocode_url, "opencage", params=params)
+            
+            # An error response must not be mistaken for (and cached as) an unknown location
+            geocode_response.raise_for_status()
             geocode_data = geocode_response.json()
             
             if not geocode_data.get("results"):
                 logger.warning(f"No results found for location: {city}, {country}")
+                if self.geocode_cache is not None:
+                    self.geocode_cache.put(city, country, None)
                 return None
                 
             latitude = geocode_data["results"][0]["geometry"]["lat"]
             longitude = geocode_data["results"][0]["geometry"]["lng"]
             
             logger.info(f"Coordinates found: {latitude}, {longitude}")
+            if self.geocode_cache is not None:
+                self.geocode_cache.put(city, country, (latitude, longitude))
             return latitude, longitude
             
         except requests.exceptions.RequestException as e:
@@ -71,15 +424,16 @@ class WeatherService:
             Weather data dictionary or None if request failed
         """
         try:
-            weather_url = (
-                f"https://api.openweathermap.org/data/3.0/onecall"
-                f"?lat={latitude}&lon={longitude}"
-                f"&exclude=minutely,hourly,daily,alerts"
-                f"&appid={api_key}&units={units}"
-            )
+            params = {
+                "lat": latitude,
+                "lon": longitude,
+                "exclude": "minutely,hourly,daily,alerts",
+                "appid": api_key,
+                "units": units
+            }
             
             logger.info(f"Fetching weather data for coordinates: {latitude}, {longitude}")
-            weather_response = requests.get(weather_url, timeout=self.timeout)
+            weather_response = self.http.get(self.weather_url, "openweather", params=params)
             
             # Check for error responses
             weather_response.raise_for_status()
@@ -107,9 +461,52 @@ class WeatherService:
             logger.error(f"Unexpected error in weather request: {str(e)}")
             return None
     
-    def get_weather_for_location(self, city: str, country: str, api_key: str, units: str = "metric") -> Dict[str, Any]:
+    @staticmethod
+    def cache_key(latitude: float, longitude: float, units: str) -> Tuple[float, float, str]:
+        """Build the weather cache key for a location."""
+        return round(latitude, 4), round(longitude, 4), units
+    
+    def peek_weather(self, city: str, country: str, units: str = "metric") -> Optional[WeatherPayload]:
         """
-        Get weather for a specific location.
+        Get weather for a location only if both its coordinates and weather are cached and fresh.
+        
+        Args:
+            city: City name
+            country: Country name
+            units: Units for weather data
+            
+        Returns:
+            Cached weather payload, or None if a network call would be needed
+        """
+        if self.geocode_cache is None:
+            return None
+            
+        found, coordinates = self.geocode_cache.get(city, country)
+        if not found or coordinates is None:
+            return None
+            
+        return self.cache.peek(self.cache_key(coordinates[0], coordinates[1], units))
+    
+    def fetch_payload(self, latitude: float, longitude: float, api_key: str, units: str = "metric") -> Optional[WeatherPayload]:
+        """
+        Fetch weather for coordinates and project it into a cacheable payload.
+        
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            api_key: OpenWeather API key
+            units: Units for weather data
+            
+        Returns:
+            Weather payload or None if the request failed
+        """
+        weather_data = self.get_weather(latitude, longitude, api_key, units)
+        return WeatherPayload(weather_data) if weather_data else None
+    
+    def get_weather_payload(self, city: str, country: str, api_key: str,
+                            units: str = "metric") -> Tuple[Optional[WeatherPayload], Optional[str]]:
+        """
+        Get the serialized weather payload for a specific location.
         
         Args:
             city: City name
@@ -118,20 +515,232 @@ class WeatherService:
             units: Units for weather data
             
         Returns:
-            Dictionary with weather data or error status
+            Tuple of (weather payload, None) or (None, error message)
         """
         # Get coordinates
         coordinates = self.get_coordinates(city, country)
         
         if not coordinates:
-            return {"status": "error", "message": "Location not found"}
+            return None, "Location not found"
             
         latitude, longitude = coordinates
         
-        # Get weather data
-        weather_data = self.get_weather(latitude, longitude, api_key, units)
+        # Get weather data, from cache unless it is due for a refresh
+        payload = self.cache.get(
+            self.cache_key(latitude, longitude, units),
+            lambda: self.fetch_payload(latitude, longitude, api_key, units)
+        )
+        
+        if not payload:
+            return None, "Weather data not available"
+            
+        return payload, None
+    
+    def get_weather_for_location(self, city: str, country: str, api_key: str, units: str = "metric") -> Dict[str, Any]:
+        """
+        Get weather for a specific location.
+        
+        Args:
+            city: City name
+            country: Country name
+            api_key: OpenWeather API key
+            units: Units for weather data
+            
+        Returns:
+            Dictionary with projected weather data or error status
+        """
+        payload, error = self.get_weather_payload(city, country, api_key, units)
         
-        if not weather_data:
-            return {"status": "error", "message": "Weather data not available"}
+        if error:
+            return {"status": "error", "message": error}
             
-        return weather_data
\ No newline at end of file
+        return payload.data
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get weather service statistics.
+        
+        Returns:
+            Dictionary with cache statistics and per-upstream request statistics
+        """
+        stats = {"weather_cache": self.cache.stats(), "upstreams": self.http.stats()}
+        if self.geocode_cache is not None:
+            stats["geocode_cache"] = self.geocode_cache.stats()
+        return stats
+
+class AsyncWeatherService:
+    """Asyncio front end for WeatherService that prefetches all known locations concurrently."""
+
+    def __init__(self, weather_service: WeatherService, max_concurrency: int = 4, prefetch_ratio: float = 0.8):
+        """
+        Initialize the async weather service.
+
+        The providers are called through the blocking pooled HTTP client on a
+        small executor, so at most max_concurrency upstream calls are in flight
+        no matter how many requests are waiting.
+
+        Args:
+            weather_service: Service that owns the caches and HTTP client
+            max_concurrency: Maximum concurrent upstream calls
+            prefetch_ratio: Refresh locations after this fraction of the cache TTL
+        """
+        self.weather_service = weather_service
+        self.max_concurrency = max_concurrency
+        self.prefetch_interval = weather_service.cache.ttl * prefetch_ratio
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="weather-fetch")
+        self._locations = {}
+        self._pinned = set()
+        self._current = None
+        self._locations_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._wake = None
+        self._prefetch_runs = 0
+
+    def register_location(self, city: str, country: str, api_key: str, units: str = "metric",
+                          pinned: bool = False):
+        """
+        Add a location to the prefetch list, or update its API key.
+
+        Pinned locations (config.WEATHER_LOCATIONS) are kept for good. An
+        unpinned location is the one from the user's settings and replaces
+        the previous unpinned one, so a changed city stops being prefetched.
+
+        Args:
+            city: City name
+            country: Country name
+            api_key: OpenWeather API key to fetch it with
+            units: Units for weather data
+            pinned: Keep the location even after another one is registered
+        """
+        key = (GeocodeCache.normalize(city, country), units)
+
+        with self._locations_lock:
+            is_new = key not in self._locations
+            self._locations[key] = (city, country, api_key, units)
+
+            if pinned:
+                self._pinned.add(key)
+            else:
+                previous, self._current = self._current, key
+                if previous is not None and previous != key and previous not in self._pinned:
+                    del self._locations[previous]
+                    logger.info(f"Stopped prefetching weather for {previous[0]}")
+
+        # Fetch a newly added location right away rather than at the next scheduled pass
+        if is_new and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self, func, *args):
+        """Run a blocking call on the bounded executor."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def get_weather_payload(self, city: str, country: str, api_key: str,
+                                  units: str = "metric") -> Tuple[Optional[WeatherPayload], Optional[str]]:
+        """
+        Get the serialized weather payload for a location without blocking the event loop.
+
+        Args:
+            city: City name
+            country: Country name
+            api_key: OpenWeather API key
+            units: Units for weather data
+
+        Returns:
+            Tuple of (weather payload, None) or (None, error message)
+        """
+        self.register_location(city, country, api_key, units)
+
+        cached = self.weather_service.peek_weather(city, country, units)
+        if cached is not None:
+            return cached, None
+
+        return await self._run(self.weather_service.get_weather_payload, city, country, api_key, units)
+
+    async def get_weather_for_location(self, city: str, country: str, api_key: str,
+                                       units: str = "metric") -> Dict[str, Any]:
+        """
+        Get weather for a location without blocking the event loop.
+
+        Args:
+            city: City name
+            country: Country name
+            api_key: OpenWeather API key
+            units: Units for weather data
+
+        Returns:
+            Dictionary with projected weather data or error status
+        """
+        payload, error = await self.get_weather_payload(city, country, api_key, units)
+
+        if error:
+            return {"status": "error", "message": error}
+
+        return payload.data
+
+    async def refresh_all(self):
+        """Geocode and then fetch weather for every registered location, all in parallel."""
+        with self._locations_lock:
+            locations = list(self._locations.values())
+
+        if not locations:
+            return
+
+        service = self.weather_service
+        coordinates = await asyncio.gather(
+            *(self._run(service.get_coordinates, city, country) for city, country, _, _ in locations)
+        )
+
+        async def fetch(location, coords):
+            _, _, api_key, units = location
+            payload = await self._run(service.fetch_payload, coords[0], coords[1], api_key, units)
+            if payload is not None:
+                service.cache.put(service.cache_key(coords[0], coords[1], units), payload)
+
+        await asyncio.gather(
+            *(fetch(location, coords) for location, coords in zip(locations, coordinates) if coords)
+        )
+
+        self._prefetch_runs += 1
+        logger.info(f"Prefetched weather for {len(locations)} location(s)")
+
+    async def _prefetch_loop(self):
+        """Refresh all locations ahead of cache expiry, forever."""
+        self._wake = asyncio.Event()
+
+        while True:
+            try:
+                await self.refresh_all()
+            except Exception as e:
+                logger.error(f"Error prefetching weather: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.prefetch_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self):
+        """Run the prefetch loop on a dedicated event loop thread; safe to call from every request."""
+        # Concurrent first requests must not each create a loop and thread
+        with self._start_lock:
+            if self._thread is not None:
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="weather-prefetch", daemon=True)
+            self._thread.start()
+            asyncio.run_coroutine_threadsafe(self._prefetch_loop(), self._loop)
+
+        logger.info(f"Weather prefetch started (every {self.prefetch_interval:.0f}s, {self.max_concurrency} concurrent)")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get prefetch statistics.
+
+        Returns:
+            Dictionary with registered locations and completed prefetch passes
+        """
+        return {"locations": len(self._locations), "prefetch_runs": self._prefetch_runs}